@@ -3,10 +3,25 @@ Command-line interface for the File Indexer.
 """
 
 import argparse
+import functools
+from string import ascii_uppercase
+from typing import Any
 
 from .indexer import FileIndexer
 from .utils import format_size
 
+SIZE_MULTIPLIERS = {
+    "B": 1,
+    "K": 1024,
+    "KB": 1024,
+    "M": 1024**2,
+    "MB": 1024**2,
+    "G": 1024**3,
+    "GB": 1024**3,
+    "T": 1024**4,
+    "TB": 1024**4,
+}
+
 
 def parse_size(size_str: str) -> int:
     """Parse size string like '100MB' to bytes."""
@@ -14,36 +29,26 @@ def parse_size(size_str: str) -> int:
         return 0
 
     size_str = size_str.upper()
-    multipliers = {
-        "B": 1,
-        "K": 1024,
-        "KB": 1024,
-        "M": 1024**2,
-        "MB": 1024**2,
-        "G": 1024**3,
-        "GB": 1024**3,
-        "T": 1024**4,
-        "TB": 1024**4,
-    }
-
-    # Extract number and unit
-    import re
-
-    match = re.match(r"^(\d+(?:\.\d+)?)\s*([A-Z]*)?$", size_str)
-    if not match:
-        raise ValueError(f"Invalid size format: {size_str}")
 
-    number = float(match.group(1))
-    unit = match.group(2) or "B"
+    # Split into number and unit: the unit is the trailing run of letters
+    number_str = size_str.rstrip(ascii_uppercase)
+    unit = size_str[len(number_str) :] or "B"
+    number_str = number_str.rstrip()
+
+    # Digits with an optional fractional part, e.g. "100" or "1.5"
+    whole, dot, fraction = number_str.partition(".")
+    if not whole.isdecimal() or (dot and not fraction.isdecimal()):
+        raise ValueError(f"Invalid size format: {size_str}")
 
-    if unit not in multipliers:
+    if unit not in SIZE_MULTIPLIERS:
         raise ValueError(f"Unknown size unit: {unit}")
 
-    return int(number * multipliers[unit])
+    return int(float(number_str) * SIZE_MULTIPLIERS[unit])
 
 
-def main() -> None:
-    """Main CLI entry point."""
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser once; parse_args() leaves it unchanged."""
     parser = argparse.ArgumentParser(description="File Indexer using DuckDB")
     parser.add_argument("--db", default="file_index.db", help="Database file path")
     parser.add_argument("--scan", help="Directory path to scan and index")
@@ -61,7 +66,7 @@ def main() -> None:
     parser.add_argument(
         "--max-workers",
         type=int,
-        help="Maximum number of worker processes for parallel operations",
+        help="Maximum number of checksum workers for parallel operations",
     )
     parser.add_argument(
         "--max-checksum-size",
@@ -79,6 +84,36 @@ def main() -> None:
         action="store_true",
         help="Force sequential processing instead of parallel (useful for systems with restricted multiprocessing)",
     )
+    parser.add_argument(
+        "--scan-workers",
+        type=int,
+        default=1,
+        help="Number of threads listing directories during recursive scans and cleanup (default: 1)",
+    )
+    parser.add_argument(
+        "--db-threads",
+        type=int,
+        help="Number of threads DuckDB uses for queries (default: all cores)",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        help="Maximum memory DuckDB may use, e.g. '4GB' (default: 80%% of RAM)",
+    )
+    parser.add_argument(
+        "--temp-dir",
+        help="Directory for DuckDB temporary files when operations exceed memory (e.g. a fast local disk)",
+    )
+    parser.add_argument(
+        "--checksum-executor",
+        choices=["process", "thread"],
+        default="thread",
+        help="Worker pool used for parallel checksums (default: thread)",
+    )
+    parser.add_argument(
+        "--hash-algorithm",
+        choices=["sha256", "blake3", "xxh3_128"],
+        help="Checksum algorithm (default: the one the database was indexed with, otherwise sha256)",
+    )
     parser.add_argument(
         "--two-phase",
         help="Perform two-phase indexing: first index without checksums, then calculate checksums for files with duplicate sizes",
@@ -127,7 +162,12 @@ def main() -> None:
         default=10000,
         help="Number of records to process per page in cleanup operations (default: 10000)",
     )
+    return parser
+
 
+def main() -> None:
+    """Main CLI entry point."""
+    parser = _build_parser()
     args = parser.parse_args()
 
     # Parse configuration
@@ -135,6 +175,13 @@ def main() -> None:
         parse_size(args.max_checksum_size) if args.max_checksum_size != "0" else 0
     )
     skip_empty_files = not args.no_skip_empty
+    duckdb_config: dict[str, Any] = {}
+    if args.db_threads:
+        duckdb_config["threads"] = args.db_threads
+    if args.memory_limit:
+        duckdb_config["memory_limit"] = args.memory_limit
+    if args.temp_dir:
+        duckdb_config["temp_directory"] = args.temp_dir
 
     indexer = FileIndexer(
         args.db,
@@ -142,6 +189,10 @@ def main() -> None:
         max_checksum_size=max_checksum_size,
         skip_empty_files=skip_empty_files,
         use_parallel_processing=not args.sequential,
+        hash_algorithm=args.hash_algorithm,
+        checksum_executor=args.checksum_executor,
+        duckdb_config=duckdb_config,
+        scan_workers=args.scan_workers,
     )
 
     try:
@@ -176,14 +227,22 @@ def main() -> None:
             elif args.search_has_checksum:
                 has_checksum = True
 
-            results = indexer.search_files(
+            search_args = (
                 args.search_filename,
                 args.search_checksum,
                 args.search_path,
-                has_checksum=has_checksum,
             )
-            if results:
-                print(f"Found {len(results)} matching files:")
+            # Stream results in batches so large result sets stay memory-bounded.
+            # The total is counted while streaming, in the same scan as the
+            # rows printed, so it is reported after them.
+            total_found = 0
+            for results in indexer.search_files_streaming(
+                *search_args,
+                has_checksum=has_checksum,
+                batch_size=args.batch_size,
+            ):
+                if not total_found and results:
+                    print("Matching files:")
                 for result in results:
                     checksum_display = (
                         result["checksum"][:16] + "..."
@@ -194,6 +253,10 @@ def main() -> None:
                     print(
                         f"  {result['path']}/{result['filename']} (checksum: {checksum_display}, size: {size_display})"
                     )
+                total_found += len(results)
+
+            if total_found:
+                print(f"Found {total_found} matching files.")
             else:
                 print("No matching files found.")
         elif args.find_duplicates:
@@ -208,6 +271,7 @@ def main() -> None:
             print(f"  Unique checksums: {stats['unique_checksums']:,}")
             print(f"  Duplicate files: {stats['duplicate_files']:,}")
             print(f"  Last indexed: {stats['last_indexed']}")
+            print(f"  Checksum algorithm: {stats['hash_algorithm']}")
 
             # Performance stats if available
             if stats["checksum_calculations"] > 0 or stats["checksum_reuses"] > 0:
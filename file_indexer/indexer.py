@@ -2,17 +2,260 @@
 Core file indexing functionality using DuckDB with performance optimizations.
 """
 
+import contextlib
+import errno
 import hashlib
+import importlib
+import itertools
 import os
+import stat
+import threading
 from collections.abc import Generator
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
 import duckdb
 
 
+def _optional_import(module_name: str) -> Any:
+    """Import an optional dependency, returning None when it is not installed."""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+
+# Optional: enables zero-copy Arrow result sets when pyarrow is installed
+pa = _optional_import("pyarrow")
+
+# Optional: faster non-cryptographic checksum algorithms for duplicate detection
+blake3 = _optional_import("blake3")
+xxhash = _optional_import("xxhash")
+
+# Checksum algorithms provided by optional packages: algorithm -> (package, module)
+OPTIONAL_HASH_ALGORITHMS: dict[str, tuple[str, Any]] = {
+    "blake3": ("blake3", blake3),
+    "xxh3_128": ("xxhash", xxhash),
+}
+
+# Checksum algorithm for new databases. Always SHA-256, whatever is
+# installed; the optional algorithms are only used when asked for.
+DEFAULT_HASH_ALGORITHM = "sha256"
+
+# Algorithm assumed for databases indexed before it was recorded
+LEGACY_HASH_ALGORITHM = "sha256"
+
+# The Go indexer stores MD5 checksums in the same schema without recording
+# the algorithm (its re-index even clears index_metadata), so unrecorded
+# checksums of this length are taken to be MD5
+GO_INDEXER_HASH_ALGORITHM = "md5"
+GO_INDEXER_CHECKSUM_LENGTH = 32
+
+# Files at least this large let BLAKE3 hash with multiple threads
+BLAKE3_MULTITHREAD_THRESHOLD = 64 * 1024 * 1024
+
+# Size of the reusable per-thread read buffer used when hashing files.
+# Files are read rather than memory-mapped: a file truncated while mapped
+# raises SIGBUS on access, which would kill the whole indexer.
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# Per-thread state for checksum workers (holds the reusable read buffer)
+_thread_state = threading.local()
+
+# DuckDB settings applied unless overridden through duckdb_config. Every
+# query that returns rows in a meaningful order has an ORDER BY, so scans,
+# aggregates and window functions need not keep insertion order.
+DEFAULT_DUCKDB_CONFIG: dict[str, Any] = {"preserve_insertion_order": False}
+
+# Executor types available for parallel checksum calculation
+CHECKSUM_EXECUTORS = ("process", "thread")
+
+# Files sharing a checksum with at least one other file, grouped by checksum.
+# A windowed count needs a single scan and, unlike a self-join, returns each
+# file once however many copies it has.
+DUPLICATES_QUERY = """
+    SELECT path, filename, file_size, checksum, modification_datetime
+    FROM (
+        SELECT path, filename, file_size, checksum, modification_datetime,
+            COUNT(*) OVER (PARTITION BY checksum) AS copies
+        FROM files
+        WHERE checksum IS NOT NULL
+    )
+    WHERE copies > 1
+    ORDER BY checksum, path, filename
+"""
+
+# Local wall-clock TIMESTAMP for an epoch-nanosecond mtime, computed by DuckDB
+# so the indexing hot path never builds a datetime per file. DuckDB's integer
+# division truncates to whole microseconds (toward zero), where
+# datetime.fromtimestamp(st_mtime) would round; _mtime_datetime is the
+# Python equivalent.
+MTIME_NS_TO_TIMESTAMP = "CAST(timezone('UTC', make_timestamp({} // 1000)) AS TIMESTAMP)"
+
+# Update of a file's checksum and stat metadata, with parameters
+# (checksum, size, mtime_ns, inode, device, indexed_at, path, filename)
+UPDATE_FILE_SQL = f"""
+    UPDATE files
+    SET checksum = $1, modification_datetime = {MTIME_NS_TO_TIMESTAMP.format("$3")},
+        file_size = $2, mtime_ns = $3, inode = $4, device = $5, indexed_at = $6
+    WHERE path = $7 AND filename = $8
+"""
+
+# (file_size, file_count) for sizes shared by several files where at least
+# one file still lacks a checksum, with parameter (min_size). COUNT(checksum)
+# skips NULLs, so it is below COUNT(*) exactly when a checksum is missing.
+SIZES_NEEDING_CHECKSUMS_SQL = """
+    SELECT file_size, COUNT(*) AS file_count
+    FROM files
+    WHERE file_size >= ?
+    GROUP BY file_size
+    HAVING COUNT(*) > 1 AND COUNT(*) > COUNT(checksum)
+"""
+
+# Secondary indexes on the files table, by name
+SECONDARY_INDEXES = {
+    "idx_checksum": "checksum",
+    "idx_modification_datetime": "modification_datetime",
+    "idx_path_filename": "path, filename",
+    "idx_file_size": "file_size",
+}
+
+# Column order of the files table as returned by search queries
+FILE_COLUMNS = [
+    "path",
+    "filename",
+    "checksum",
+    "modification_datetime",
+    "file_size",
+    "indexed_at",
+]
+
+
+def _validate_hash_algorithm(algorithm: str) -> None:
+    """Raise ValueError if the checksum algorithm is unknown or not installed."""
+    if algorithm in OPTIONAL_HASH_ALGORITHMS:
+        package, module = OPTIONAL_HASH_ALGORITHMS[algorithm]
+        if module is None:
+            raise ValueError(
+                f"Checksum algorithm '{algorithm}' requires the '{package}' package"
+            )
+    elif algorithm not in hashlib.algorithms_available:
+        raise ValueError(f"Unknown checksum algorithm: {algorithm}")
+
+
+def _new_hash(algorithm: str, file_size: int = 0) -> Any:
+    """Create a hash object for the given checksum algorithm."""
+    if algorithm == "blake3":
+        max_threads = 1
+        if file_size >= BLAKE3_MULTITHREAD_THRESHOLD:
+            max_threads = blake3.blake3.AUTO
+        return blake3.blake3(max_threads=max_threads)
+    if algorithm == "xxh3_128":
+        return xxhash.xxh3_128()
+    # Checksums identify content rather than protect it, so OpenSSL may use
+    # any implementation, including ones restricted in FIPS mode
+    return hashlib.new(algorithm, usedforsecurity=False)
+
+
+class FileRecord(NamedTuple):
+    """Stored state of an indexed file, as used for change detection."""
+
+    checksum: str | None
+    modification_datetime: datetime
+    file_size: int
+    mtime_ns: int | None
+    inode: int | None
+
+
+# Columns of the files table that make up a FileRecord
+FILE_RECORD_COLUMNS = "checksum, modification_datetime, file_size, mtime_ns, inode"
+
+
+def _mtime_datetime(mtime_ns: int) -> datetime:
+    """Local datetime for an epoch-nanosecond mtime, as MTIME_NS_TO_TIMESTAMP."""
+    # Truncate toward zero like DuckDB; whole microseconds survive the float
+    micros = abs(mtime_ns) // 1000
+    return datetime.fromtimestamp((micros if mtime_ns >= 0 else -micros) / 1e6)
+
+
+def _record_unchanged(stat_info: os.stat_result, record: FileRecord) -> bool:
+    """Whether a stored record still describes the file behind stat_info."""
+    if stat_info.st_size != record.file_size:
+        return False
+    if record.mtime_ns is not None:
+        # Exact integer comparison, no datetime conversion or rounding
+        return bool(
+            stat_info.st_mtime_ns == record.mtime_ns
+            and stat_info.st_ino == record.inode
+        )
+    # Rows indexed before mtime_ns was stored only have the TIMESTAMP column:
+    # truncated to microseconds like MTIME_NS_TO_TIMESTAMP, or rounded by
+    # datetime.fromtimestamp in older versions
+    return record.modification_datetime in (
+        _mtime_datetime(stat_info.st_mtime_ns),
+        datetime.fromtimestamp(stat_info.st_mtime),
+    )
+
+
+def _has_file_identity(stat_info: os.stat_result) -> bool:
+    """
+    Whether (st_dev, st_ino) identifies the file. Some platforms and
+    filesystems (e.g. os.DirEntry.stat() on Windows) report 0 for both.
+    """
+    return stat_info.st_ino != 0
+
+
+def _hash_buffer() -> memoryview:
+    """Return this thread's reusable read buffer, allocating it on first use."""
+    buffer: memoryview | None = getattr(_thread_state, "buffer", None)
+    if buffer is None:
+        buffer = memoryview(bytearray(HASH_BUFFER_SIZE))
+        _thread_state.buffer = buffer
+    return buffer
+
+
+def _open_for_hashing(file_path: str) -> int:
+    """
+    Open a file read-only for hashing and return its descriptor. Where the
+    platform allows, a symlink is not followed (raising ELOOP), a FIFO that
+    replaced the file since it was checked opens without blocking so the
+    caller can still reject it after an fstat, reading does not update the
+    access time, and the kernel is told to read ahead aggressively.
+    """
+    flags = os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_NONBLOCK", 0)
+    noatime = getattr(os, "O_NOATIME", 0)
+    try:
+        fd = os.open(file_path, flags | noatime)
+    except PermissionError:
+        if not noatime:
+            raise
+        # O_NOATIME is only permitted to the file's owner
+        fd = os.open(file_path, flags)
+    if hasattr(os, "posix_fadvise"):
+        with contextlib.suppress(OSError):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return fd
+
+
+def _list_directory(path: str) -> tuple[list[os.DirEntry[str]], OSError | None]:
+    """List a directory for a scan worker thread, returning any error."""
+    try:
+        with os.scandir(path) as entries:
+            return list(entries), None
+    except OSError as e:
+        return [], e
+
+
 def _calculate_checksum_worker(
     file_path: str, algorithm: str = "sha256"
 ) -> tuple[str, str]:
@@ -21,22 +264,45 @@ def _calculate_checksum_worker(
     Returns (file_path, checksum) tuple.
     """
     try:
-        path_obj = Path(file_path)
+        # Safety check: Skip symlinks and special files before opening them,
+        # since opening a device or FIFO can have side effects
+        try:
+            stat_info = os.lstat(file_path)
+        except FileNotFoundError:
+            print(f"Skipping special file during checksum calculation: {file_path}")
+            return (file_path, "")
 
-        # Safety check: Skip symlinks and special files
-        if path_obj.is_symlink():
+        if stat.S_ISLNK(stat_info.st_mode):
             print(f"Skipping symlink during checksum calculation: {file_path}")
             return (file_path, "")
 
-        if not path_obj.is_file():
+        if not stat.S_ISREG(stat_info.st_mode):
             print(f"Skipping special file during checksum calculation: {file_path}")
             return (file_path, "")
 
-        hash_func: Any = getattr(hashlib, algorithm)()
-        with path_obj.open("rb") as f:
-            # Read file in larger chunks for better performance
-            for chunk in iter(lambda: f.read(65536), b""):  # 64KB chunks
-                hash_func.update(chunk)
+        # The path may have been replaced since the lstat, so the descriptor
+        # is checked again: the file classified is then the file hashed
+        try:
+            fd = _open_for_hashing(file_path)
+        except OSError as e:
+            if e.errno != errno.ELOOP:
+                raise
+            print(f"Skipping symlink during checksum calculation: {file_path}")
+            return (file_path, "")
+
+        with os.fdopen(fd, "rb", buffering=0) as f:
+            stat_info = os.fstat(fd)
+            if not stat.S_ISREG(stat_info.st_mode):
+                print(f"Skipping special file during checksum calculation: {file_path}")
+                return (file_path, "")
+
+            hash_func = _new_hash(algorithm, stat_info.st_size)
+
+            # Read into a reused buffer, in a single call for most files, with
+            # no per-chunk allocations. A file shrinking meanwhile just ends early.
+            buffer = _hash_buffer()
+            while bytes_read := f.readinto(buffer):
+                hash_func.update(buffer[:bytes_read])
         return (file_path, str(hash_func.hexdigest()))
     except PermissionError as e:
         # Permission denied - return empty checksum
@@ -56,25 +322,53 @@ class FileIndexer:
         max_checksum_size: int = 100 * 1024 * 1024,  # 100MB default
         skip_empty_files: bool = True,
         use_parallel_processing: bool = True,
+        hash_algorithm: str | None = None,
+        checksum_executor: str = "thread",
+        duckdb_config: dict[str, Any] | None = None,
+        scan_workers: int = 1,
     ):
         """
         Initialize the FileIndexer with a DuckDB database.
 
         Args:
             db_path: Path to the DuckDB database file
-            max_workers: Maximum number of worker processes for parallel operations
+            max_workers: Maximum number of checksum workers for parallel operations
             max_checksum_size: Maximum file size in bytes to calculate checksums for (0 = no limit)
             skip_empty_files: Whether to skip checksum calculation for empty files
             use_parallel_processing: Whether to use parallel processing for checksums (False forces sequential)
+            hash_algorithm: Checksum algorithm ("sha256", or "blake3"/"xxh3_128" when installed).
+                None uses the algorithm recorded in the database, or DEFAULT_HASH_ALGORITHM for a new one
+            checksum_executor: "thread" for a thread pool (default; hash functions release the GIL
+                while hashing, so threads avoid process startup and IPC), "process" for a worker process pool
+            duckdb_config: Extra DuckDB settings for the connection, e.g. {"threads": 8, "temp_directory": "/fast/tmp"},
+                on top of DEFAULT_DUCKDB_CONFIG
+            scan_workers: Number of threads listing directories during recursive scans and cleanup
+                (1 scans sequentially; more helps on network filesystems and deep trees)
         """
+        if hash_algorithm is not None:
+            _validate_hash_algorithm(hash_algorithm)
+        if checksum_executor not in CHECKSUM_EXECUTORS:
+            raise ValueError(f"Unknown checksum executor: {checksum_executor}")
+
         self.db_path = db_path
-        self.conn = duckdb.connect(db_path)
+        self.conn = duckdb.connect(
+            db_path, config={**DEFAULT_DUCKDB_CONFIG, **(duckdb_config or {})}
+        )
         self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
         self.max_checksum_size = max_checksum_size
         self.skip_empty_files = skip_empty_files
+        self.checksum_executor = checksum_executor
+        self.scan_workers = max(1, scan_workers)
         # Use parallel processing only if explicitly enabled and max_workers > 1
         self.use_parallel_processing = use_parallel_processing and self.max_workers > 1
+        # Worker pool is created on first use and reused across batches
+        self._checksum_pool: Executor | None = None
         self._create_table()
+        try:
+            self.hash_algorithm = self._resolve_hash_algorithm(hash_algorithm)
+        except ValueError:
+            self.conn.close()
+            raise
 
         # Statistics for optimization tracking
         self.checksum_calculations = 0
@@ -101,59 +395,99 @@ class FileIndexer:
         """
         self.conn.execute(create_table_sql)
 
-        # Create optimized indexes
+        # Also restores indexes left dropped by an interrupted bulk load
+        self._create_indexes()
+
+        # Exact change detection and file identity (the same UBIGINT types as
+        # checksum_cache); added to databases created before these existed
         self.conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_checksum ON files(checksum);
-        CREATE INDEX IF NOT EXISTS idx_modification_datetime ON files(modification_datetime);
-        CREATE INDEX IF NOT EXISTS idx_path_filename ON files(path, filename);
-        CREATE INDEX IF NOT EXISTS idx_file_size ON files(file_size);
+        ALTER TABLE files ADD COLUMN IF NOT EXISTS mtime_ns BIGINT;
+        ALTER TABLE files ADD COLUMN IF NOT EXISTS inode UBIGINT;
+        ALTER TABLE files ADD COLUMN IF NOT EXISTS device UBIGINT;
         """)
 
-    def _should_process_file(
-        self, file_path: str | Path, check_empty_files: bool = False
-    ) -> bool:
-        """
-        Shared helper function to determine if a file should be processed.
-        Handles symlinks, special files, and optionally empty files.
-        Updates appropriate counters.
+        # Checksums by file identity, so unchanged files indexed again (e.g.
+        # after their rows were removed) are not hashed again
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS checksum_cache (
+            device UBIGINT NOT NULL,
+            inode UBIGINT NOT NULL,
+            mtime_ns BIGINT NOT NULL,
+            file_size BIGINT NOT NULL,
+            checksum VARCHAR NOT NULL,
+            ctime_ns BIGINT,
+            PRIMARY KEY (device, inode)
+        );
+        """)
+        # Rows cached before ctime_ns was stored have NULL and never match
+        self.conn.execute(
+            "ALTER TABLE checksum_cache ADD COLUMN IF NOT EXISTS ctime_ns BIGINT"
+        )
 
-        Args:
-            file_path: Path to the file to check
-            check_empty_files: Whether to also check for empty files (respects skip_empty_files setting)
+        # Key/value settings of the index (same layout as the Go indexer)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS index_metadata (
+            key VARCHAR PRIMARY KEY,
+            value VARCHAR
+        );
+        """)
 
-        Returns:
-            True if the file should be processed, False otherwise
-        """
-        try:
-            path_obj = Path(file_path)
+    def _create_indexes(self) -> None:
+        """Create the secondary indexes of the files table."""
+        for name, columns in SECONDARY_INDEXES.items():
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON files({columns})")
 
-            # Skip symbolic links
-            if path_obj.is_symlink():
-                self.ignored_symlinks += 1
-                return False
+    def _drop_indexes(self) -> None:
+        """Drop the secondary indexes of the files table before a bulk load."""
+        for name in SECONDARY_INDEXES:
+            self.conn.execute(f"DROP INDEX IF EXISTS {name}")
 
-            # Skip special files (device files, pipes, sockets, etc.)
-            # Only process regular files
-            if not path_obj.is_file():
-                self.ignored_special_files += 1
-                return False
+    def _resolve_hash_algorithm(self, requested: str | None) -> str:
+        """
+        Pick the checksum algorithm for this database and record it.
 
-            # Skip empty files if requested and skip_empty_files is True
-            if check_empty_files and self.skip_empty_files:
-                try:
-                    file_size = path_obj.stat().st_size
-                    if file_size == 0:
-                        self.skipped_checksums += 1
-                        return False
-                except (OSError, PermissionError):
-                    # If we can't get file size, let it through and handle later
-                    pass
+        Checksums of different algorithms never match, so once a database
+        holds checksums it keeps the algorithm it was indexed with. Only an
+        explicitly requested algorithm is checked to be installed here; the
+        recorded one is checked before hashing, so a database indexed with
+        an optional algorithm can be searched and cleaned up without it.
+        """
+        row = self.conn.execute(
+            "SELECT value FROM index_metadata WHERE key = 'hash_algorithm'"
+        ).fetchone()
+        stored = row[0] if row else None
+        checksum_row = self.conn.execute(
+            "SELECT length(checksum) FROM files WHERE checksum IS NOT NULL LIMIT 1"
+        ).fetchone()
+        has_checksums = checksum_row is not None
+        if stored is None and checksum_row is not None:
+            stored = (
+                GO_INDEXER_HASH_ALGORITHM
+                if checksum_row[0] == GO_INDEXER_CHECKSUM_LENGTH
+                else LEGACY_HASH_ALGORITHM
+            )
 
-            return True
+        if requested is None:
+            algorithm = stored or DEFAULT_HASH_ALGORITHM
+        elif stored and requested != stored and has_checksums:
+            raise ValueError(
+                f"Database checksums use '{stored}', cannot index with '{requested}'"
+            )
+        else:
+            algorithm = requested
 
-        except (OSError, PermissionError):
-            # If we can't check the file, assume it's not processable
-            return False
+        if row is None or row[0] != algorithm:
+            # Cached checksums were computed with the previous algorithm
+            self.conn.execute("DELETE FROM checksum_cache")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO index_metadata (key, value) VALUES ('hash_algorithm', ?)",
+                [algorithm],
+            )
+        return algorithm
+
+    def _require_hash_algorithm(self) -> None:
+        """Raise ValueError before hashing if the checksum algorithm is not installed."""
+        _validate_hash_algorithm(self.hash_algorithm)
 
     def _should_calculate_checksum(self, file_size: int) -> bool:
         """
@@ -165,19 +499,21 @@ class FileIndexer:
         Returns:
             True if checksum should be calculated, False otherwise
         """
-        # Special case: negative max_checksum_size means skip all checksums
-        if self.max_checksum_size < 0:
-            return False
+        max_size = self.max_checksum_size
 
-        if self.skip_empty_files and file_size == 0:
+        # Special case: negative max_checksum_size means skip all checksums
+        if max_size < 0 or (file_size == 0 and self.skip_empty_files):
             return False
 
-        return not (self.max_checksum_size > 0 and file_size > self.max_checksum_size)
+        return max_size == 0 or file_size <= max_size
 
-    def _calculate_checksum(self, file_path: str, algorithm: str = "sha256") -> str:
+    def _calculate_checksum(self, file_path: str, algorithm: str | None = None) -> str:
         """
         Calculate checksum for a file (kept for compatibility).
+        Uses the indexer's hash_algorithm unless one is given.
         """
+        algorithm = algorithm or self.hash_algorithm
+        _validate_hash_algorithm(algorithm)
         _, checksum = _calculate_checksum_worker(file_path, algorithm)
         return checksum
 
@@ -194,30 +530,106 @@ class FileIndexer:
         Yields:
             File paths (excluding symbolic links, device files, pipes, sockets, etc.)
         """
-        if not Path(directory_path).exists():
+        for entry in self._iter_file_entries(directory_path, recursive):
+            yield entry.path
+
+    def _iter_file_entries(
+        self, directory_path: str, recursive: bool = True
+    ) -> Generator[os.DirEntry[str], None, None]:
+        """
+        Yield os.DirEntry objects for the regular files under directory_path.
+        Entries cache their type and stat result, so callers can get file
+        metadata without another syscall through the path.
+        """
+        # A single stat validates both existence and directory-ness
+        root = Path(directory_path)
+        try:
+            dir_stat = root.stat()
+        except FileNotFoundError:
             print(f"Directory does not exist: {directory_path}")
             return
+        except OSError as e:
+            print(f"Error scanning directory {directory_path}: {e}")
+            return
 
-        if not Path(directory_path).is_dir():
+        if not stat.S_ISDIR(dir_stat.st_mode):
             print(f"Path is not a directory: {directory_path}")
             return
 
+        if recursive and self.scan_workers > 1:
+            yield from self._iter_file_entries_threaded(str(root))
+            return
+
+        # os.scandir exposes the entry type from the directory listing itself,
+        # so regular files, symlinks and subdirectories need no extra stat call
+        pending = [str(root)]
+        while pending:
+            current = pending.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            # Never follow directory symlinks (same as os.walk)
+                            if recursive and not entry.is_symlink():
+                                pending.append(entry.path)
+                        elif self._should_process_entry(entry):
+                            yield entry
+            except OSError as e:
+                print(f"Error scanning directory {current}: {e}")
+
+    def _iter_file_entries_threaded(
+        self, root: str
+    ) -> Generator[os.DirEntry[str], None, None]:
+        """
+        Recursive _iter_file_entries with directories listed by a thread pool,
+        so several scandir calls are in flight at once. Entries are classified
+        (and counters updated) in the calling thread only; file order differs
+        from the sequential scan.
+        """
+        executor = ThreadPoolExecutor(
+            max_workers=self.scan_workers, thread_name_prefix="scan"
+        )
         try:
-            if recursive:
-                for root, _dirs, filenames in os.walk(directory_path):
-                    for filename in filenames:
-                        file_path = Path(root) / filename
-
-                        # Use shared helper function
-                        if self._should_process_file(file_path):
-                            yield str(file_path)
-            else:
-                for item in Path(directory_path).iterdir():
-                    # Use shared helper function
-                    if self._should_process_file(item):
-                        yield str(item)
-        except OSError as e:
-            print(f"Error scanning directory {directory_path}: {e}")
+            pending: dict[Future[tuple[list[os.DirEntry[str]], OSError | None]], str]
+            pending = {executor.submit(_list_directory, root): root}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    current = pending.pop(future)
+                    entries, error = future.result()
+                    if error is not None:
+                        print(f"Error scanning directory {current}: {error}")
+                        continue
+                    for entry in entries:
+                        if entry.is_dir():
+                            # Never follow directory symlinks (same as os.walk)
+                            if not entry.is_symlink():
+                                pending[
+                                    executor.submit(_list_directory, entry.path)
+                                ] = entry.path
+                        elif self._should_process_entry(entry):
+                            yield entry
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _should_process_entry(self, entry: os.DirEntry[str]) -> bool:
+        """
+        Whether a directory entry is a regular file worth indexing.
+        Uses the cached entry type instead of stat-ing the path again.
+        """
+        try:
+            if entry.is_symlink():
+                self.ignored_symlinks += 1
+                return False
+
+            if not entry.is_file(follow_symlinks=False):
+                self.ignored_special_files += 1
+                return False
+
+            return True
+        except OSError:
+            self.ignored_special_files += 1
+            return False
 
     def scan_directory(self, directory_path: str, recursive: bool = True) -> list[str]:
         """
@@ -227,12 +639,12 @@ class FileIndexer:
 
     def _get_existing_files_bulk(
         self, file_paths: list[str]
-    ) -> dict[tuple[str, str], tuple[str | None, datetime, int]]:
+    ) -> dict[tuple[str, str], FileRecord]:
         """
         Get existing file records in bulk to avoid N+1 query problem.
 
         Returns:
-            Dictionary mapping (path, filename) to (checksum, modification_datetime, file_size)
+            Dictionary mapping (path, filename) to the stored FileRecord
         """
         if not file_paths:
             return {}
@@ -243,66 +655,90 @@ class FileIndexer:
             path_obj = Path(file_path)
             path_filename_pairs.append((str(path_obj.parent), path_obj.name))
 
-        # Build bulk query with IN clause
-        placeholders = ",".join(["(?, ?)"] * len(path_filename_pairs))
-        query = f"""
-        SELECT path, filename, checksum, modification_datetime, file_size
-        FROM files
-        WHERE (path, filename) IN ({placeholders})
-        """
+        if pa is not None:
+            # Join against the batch as an Arrow table instead of binding
+            # two parameters per file into a large IN list
+            paths, filenames = zip(*path_filename_pairs, strict=True)
+            lookup = pa.table(
+                {
+                    "path": pa.array(paths, pa.string()),
+                    "filename": pa.array(filenames, pa.string()),
+                }
+            )
+            self.conn.register("lookup_files", lookup)
+            try:
+                results = self.conn.execute("""
+                SELECT f.path, f.filename, f.checksum, f.modification_datetime,
+                    f.file_size, f.mtime_ns, f.inode
+                FROM files f
+                JOIN lookup_files l ON f.path = l.path AND f.filename = l.filename
+                """).fetchall()
+            finally:
+                self.conn.unregister("lookup_files")
+        else:
+            # Build bulk query with IN clause
+            placeholders = ",".join(["(?, ?)"] * len(path_filename_pairs))
+            query = f"""
+            SELECT path, filename, {FILE_RECORD_COLUMNS}
+            FROM files
+            WHERE (path, filename) IN ({placeholders})
+            """
 
-        # Flatten the pairs for the query parameters
-        params = []
-        for path, filename in path_filename_pairs:
-            params.extend([path, filename])
+            # Flatten the pairs for the query parameters
+            params = []
+            for path, filename in path_filename_pairs:
+                params.extend([path, filename])
 
-        results = self.conn.execute(query, params).fetchall()
+            results = self.conn.execute(query, params).fetchall()
 
         # Build lookup dictionary
         existing_files = {}
-        for path, filename, checksum, mod_time, file_size in results:
-            existing_files[(path, filename)] = (checksum, mod_time, file_size)
+        for path, filename, *record in results:
+            existing_files[(path, filename)] = FileRecord(*record)
 
         return existing_files
 
     def _process_files_batch(
-        self, file_paths: list[str], existing_files: dict
+        self,
+        file_paths: list[str],
+        existing_files: dict[tuple[str, str], FileRecord],
+        stat_results: dict[str, os.stat_result] | None = None,
     ) -> tuple[list, list, list]:
         """
         Process a batch of files, determining which need checksum calculation.
+        Files without an entry in stat_results are stat-ed here.
 
         Returns:
-            (files_needing_checksums, files_to_update, files_to_insert)
+            (files_needing_checksums, files_to_update, files_to_insert), where
+            the update/insert entries are
+            (file_path, directory, filename, stat_info, needs_checksum)
         """
         files_needing_checksums = []
         files_to_update = []
         files_to_insert = []
 
+        # Bind hot lookups to locals once per batch
+        get_existing = existing_files.get
+        should_calculate_checksum = self._should_calculate_checksum
+        get_stat = (stat_results or {}).get
+
         for file_path in file_paths:
             try:
                 path_obj = Path(file_path)
-                stat_info = path_obj.stat()
+                stat_info = get_stat(file_path) or path_obj.stat()
 
                 directory = str(path_obj.parent)
                 filename = path_obj.name
-                modification_datetime = datetime.fromtimestamp(stat_info.st_mtime)
-                file_size = stat_info.st_size
 
-                existing_record = existing_files.get((directory, filename))
-                should_calc_checksum = self._should_calculate_checksum(file_size)
+                existing_record = get_existing((directory, filename))
+                should_calc_checksum = should_calculate_checksum(stat_info.st_size)
 
                 if existing_record:
-                    existing_checksum, existing_mod_time, existing_size = (
-                        existing_record
-                    )
                     # Check if file has been modified
-                    if (
-                        modification_datetime == existing_mod_time
-                        and file_size == existing_size
-                    ):
+                    if _record_unchanged(stat_info, existing_record):
                         # File unchanged, skip
                         if (
-                            existing_checksum is not None
+                            existing_record.checksum is not None
                         ):  # Only count as reuse if there was actually a checksum
                             self.checksum_reuses += 1
                         self.skipped_files += 1
@@ -318,8 +754,7 @@ class FileIndexer:
                                 file_path,
                                 directory,
                                 filename,
-                                modification_datetime,
-                                file_size,
+                                stat_info,
                                 should_calc_checksum,
                             )
                         )
@@ -334,8 +769,7 @@ class FileIndexer:
                             file_path,
                             directory,
                             filename,
-                            modification_datetime,
-                            file_size,
+                            stat_info,
                             should_calc_checksum,
                         )
                     )
@@ -365,41 +799,216 @@ class FileIndexer:
 
         # Try parallel processing first
         try:
-            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
-                # Submit all checksum calculations
-                future_to_path = {
-                    executor.submit(_calculate_checksum_worker, file_path): file_path
-                    for file_path in file_paths
-                }
+            executor = self._get_checksum_pool()
+            # Hand files to workers in chunks to cut per-file IPC round trips
+            chunksize = max(1, min(64, len(file_paths) // (self.max_workers * 4)))
+            results = executor.map(
+                _calculate_checksum_worker,
+                file_paths,
+                itertools.repeat(self.hash_algorithm),
+                chunksize=chunksize,
+            )
+            for file_path, checksum in results:
+                if checksum:  # Only store successful checksums
+                    checksums[file_path] = checksum
+                    self.checksum_calculations += 1
+                # Note: Permission errors are already reported by the worker process
 
-                # Collect results as they complete
-                for future in as_completed(future_to_path):
-                    try:
-                        file_path, checksum = future.result()
-                        if checksum:  # Only store successful checksums
-                            checksums[file_path] = checksum
-                            self.checksum_calculations += 1
-                        # Note: Permission errors are already reported by the worker process
-                    except Exception as e:
-                        file_path = future_to_path[future]
-                        print(f"Error calculating checksum for {file_path}: {e}")
-
-        except (PermissionError, OSError) as e:
+        except (PermissionError, OSError, BrokenProcessPool) as e:
             # Fall back to sequential processing when parallel processing is not available
             print(
                 f"Parallel processing not available ({e}), falling back to sequential processing..."
             )
-            checksums = self._calculate_checksums_sequential(file_paths)
+            self._shutdown_checksum_pool()
+            remaining = [path for path in file_paths if path not in checksums]
+            checksums.update(self._calculate_checksums_sequential(remaining))
+
+        return checksums
+
+    def _calculate_checksums_cached(
+        self, file_paths: list[str], stat_results: dict[str, os.stat_result]
+    ) -> dict[str, str]:
+        """
+        Calculate checksums, reusing cached ones for files whose device, inode,
+        mtime_ns, ctime_ns and size are unchanged. Files missing from
+        stat_results, or without an inode number, are always hashed. New
+        checksums are added to the cache.
+        """
+        # Empty regular files all hash to the digest of no input, so they
+        # need neither a cache lookup nor an open/read
+        empty = {
+            path
+            for path in file_paths
+            if path in stat_results
+            and stat_results[path].st_size == 0
+            and stat.S_ISREG(stat_results[path].st_mode)
+        }
+        self.checksum_calculations += len(empty)
+
+        cached = self._get_cached_checksums(
+            {
+                path: stat_results[path]
+                for path in file_paths
+                if path in stat_results and path not in empty
+            }
+        )
+        self.checksum_reuses += len(cached)
+
+        checksums = self._calculate_checksums_parallel(
+            [path for path in file_paths if path not in cached and path not in empty]
+        )
+        self._store_cached_checksums(checksums, stat_results)
 
+        checksums.update(cached)
+        if empty:
+            empty_checksum = str(_new_hash(self.hash_algorithm).hexdigest())
+            checksums.update(dict.fromkeys(empty, empty_checksum))
         return checksums
 
+    def _get_cached_checksums(
+        self, stat_results: dict[str, os.stat_result]
+    ) -> dict[str, str]:
+        """Look up cached checksums that still match the given stat results."""
+        if not stat_results:
+            return {}
+
+        # Hard links share a (device, inode), so a key can map to several paths
+        paths_by_key: dict[tuple[int, int], list[str]] = {}
+        for path, stat_info in stat_results.items():
+            if _has_file_identity(stat_info):
+                paths_by_key.setdefault(
+                    (stat_info.st_dev, stat_info.st_ino), []
+                ).append(path)
+        if not paths_by_key:
+            return {}
+
+        if pa is not None:
+            devices, inodes = zip(*paths_by_key, strict=True)
+            lookup = pa.table(
+                {
+                    "device": pa.array(devices, pa.uint64()),
+                    "inode": pa.array(inodes, pa.uint64()),
+                }
+            )
+            self.conn.register("lookup_inodes", lookup)
+            try:
+                results = self.conn.execute("""
+                SELECT c.device, c.inode, c.mtime_ns, c.ctime_ns, c.file_size,
+                    c.checksum
+                FROM checksum_cache c
+                JOIN lookup_inodes l ON c.device = l.device AND c.inode = l.inode
+                """).fetchall()
+            finally:
+                self.conn.unregister("lookup_inodes")
+        else:
+            placeholders = ",".join(["(?, ?)"] * len(paths_by_key))
+            params = [value for key in paths_by_key for value in key]
+            results = self.conn.execute(
+                f"""
+                SELECT device, inode, mtime_ns, ctime_ns, file_size, checksum
+                FROM checksum_cache
+                WHERE (device, inode) IN ({placeholders})
+                """,
+                params,
+            ).fetchall()
+
+        cached = {}
+        for device, inode, mtime_ns, ctime_ns, file_size, checksum in results:
+            for path in paths_by_key[(device, inode)]:
+                stat_info = stat_results[path]
+                # ctime_ns changes on any write and cannot be set back, so a
+                # reused inode with a restored mtime and size still misses
+                if (
+                    stat_info.st_mtime_ns == mtime_ns
+                    and stat_info.st_ctime_ns == ctime_ns
+                    and stat_info.st_size == file_size
+                ):
+                    cached[path] = checksum
+        return cached
+
+    def _store_cached_checksums(
+        self, checksums: dict[str, str], stat_results: dict[str, os.stat_result]
+    ) -> None:
+        """Record freshly calculated checksums in the checksum cache."""
+        rows = {}
+        for path, checksum in checksums.items():
+            stat_info = stat_results.get(path)
+            if stat_info is not None and _has_file_identity(stat_info):
+                # One row per (device, inode), even for hard links in one batch
+                rows[(stat_info.st_dev, stat_info.st_ino)] = (
+                    stat_info.st_mtime_ns,
+                    stat_info.st_ctime_ns,
+                    stat_info.st_size,
+                    checksum,
+                )
+        if not rows:
+            return
+
+        if pa is not None:
+            devices, inodes = zip(*rows, strict=True)
+            mtimes, ctimes, sizes, values = zip(*rows.values(), strict=True)
+            table = pa.table(
+                {
+                    "device": pa.array(devices, pa.uint64()),
+                    "inode": pa.array(inodes, pa.uint64()),
+                    "mtime_ns": pa.array(mtimes, pa.int64()),
+                    "ctime_ns": pa.array(ctimes, pa.int64()),
+                    "file_size": pa.array(sizes, pa.int64()),
+                    "checksum": pa.array(values, pa.string()),
+                }
+            )
+            self.conn.register("incoming_checksums", table)
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO checksum_cache BY NAME SELECT * FROM incoming_checksums"
+                )
+            finally:
+                self.conn.unregister("incoming_checksums")
+        else:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO checksum_cache
+                    (device, inode, mtime_ns, ctime_ns, file_size, checksum)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [(*key, *value) for key, value in rows.items()],
+            )
+
+    def _prune_checksum_cache(self) -> None:
+        """
+        Drop cached checksums for (device, inode) pairs no longer referenced
+        by any file. An inode number alone is only unique per device.
+        """
+        self.conn.execute("""
+        DELETE FROM checksum_cache c
+        WHERE NOT EXISTS (
+            SELECT 1 FROM files f
+            WHERE f.inode = c.inode AND f.device = c.device
+        )
+        """)
+
+    def _get_checksum_pool(self) -> Executor:
+        """Return the checksum worker pool, starting it on first use."""
+        if self._checksum_pool is None:
+            if self.checksum_executor == "thread":
+                self._checksum_pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._checksum_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._checksum_pool
+
+    def _shutdown_checksum_pool(self) -> None:
+        """Stop the checksum worker pool if it was started."""
+        if self._checksum_pool is not None:
+            self._checksum_pool.shutdown(cancel_futures=True)
+            self._checksum_pool = None
+
     def _calculate_checksums_sequential(self, file_paths: list[str]) -> dict[str, str]:
         """Calculate checksums for multiple files sequentially (fallback method)."""
         checksums = {}
 
         for file_path in file_paths:
             try:
-                _, checksum = _calculate_checksum_worker(file_path)
+                _, checksum = _calculate_checksum_worker(file_path, self.hash_algorithm)
                 if checksum:  # Only store successful checksums
                     checksums[file_path] = checksum
                     self.checksum_calculations += 1
@@ -415,27 +1024,36 @@ class FileIndexer:
         added = 0
         updated = 0
 
+        # One timestamp for the whole batch instead of CURRENT_TIMESTAMP per row
+        indexed_at = datetime.now()
+
         # Begin transaction for better performance
         self.conn.execute("BEGIN TRANSACTION")
 
         try:
             # Bulk inserts
             if inserts:
-                insert_sql = """
-                INSERT INTO files (path, filename, checksum, modification_datetime, file_size)
-                VALUES (?, ?, ?, ?, ?)
-                """
-                self.conn.executemany(insert_sql, inserts)
+                if pa is not None:
+                    self._bulk_insert_arrow(inserts, indexed_at)
+                else:
+                    insert_sql = f"""
+                    INSERT INTO files (path, filename, checksum, modification_datetime, file_size, mtime_ns, inode, device, indexed_at)
+                    VALUES ($1, $2, $3, {MTIME_NS_TO_TIMESTAMP.format("$5")}, $4, $5, $6, $7, $8)
+                    """
+                    self.conn.executemany(
+                        insert_sql, [(*row, indexed_at) for row in inserts]
+                    )
                 added = len(inserts)
 
             # Bulk updates
             if updates:
-                update_sql = """
-                UPDATE files
-                SET checksum = ?, modification_datetime = ?, file_size = ?, indexed_at = CURRENT_TIMESTAMP
-                WHERE path = ? AND filename = ?
-                """
-                self.conn.executemany(update_sql, updates)
+                if pa is not None:
+                    self._bulk_update_arrow(updates, indexed_at)
+                else:
+                    self.conn.executemany(
+                        UPDATE_FILE_SQL,
+                        [(*row[:5], indexed_at, *row[5:]) for row in updates],
+                    )
                 updated = len(updates)
 
             self.conn.execute("COMMIT")
@@ -447,6 +1065,96 @@ class FileIndexer:
 
         return added, updated
 
+    def _bulk_insert_arrow(self, inserts: list, indexed_at: datetime) -> None:
+        """
+        Insert (path, filename, checksum, size, mtime_ns, inode, device) rows
+        via one Arrow scan.
+        """
+        columns = list(zip(*inserts, strict=True))
+        table = pa.table(
+            {
+                "path": pa.array(columns[0], pa.string()),
+                "filename": pa.array(columns[1], pa.string()),
+                "checksum": pa.array(columns[2], pa.string()),
+                "file_size": pa.array(columns[3], pa.int64()),
+                "mtime_ns": pa.array(columns[4], pa.int64()),
+                "inode": pa.array(columns[5], pa.uint64()),
+                "device": pa.array(columns[6], pa.uint64()),
+            }
+        )
+        self.conn.register("incoming_files", table)
+        try:
+            self.conn.execute(
+                f"""
+                INSERT INTO files (path, filename, checksum, modification_datetime, file_size, mtime_ns, inode, device, indexed_at)
+                SELECT path, filename, checksum, {MTIME_NS_TO_TIMESTAMP.format("mtime_ns")},
+                    file_size, mtime_ns, inode, device, ?
+                FROM incoming_files
+                """,
+                [indexed_at],
+            )
+        finally:
+            self.conn.unregister("incoming_files")
+
+    def _bulk_update_arrow(self, updates: list, indexed_at: datetime) -> None:
+        """
+        Apply (checksum, size, mtime_ns, inode, device, path, filename)
+        updates via one Arrow join.
+        """
+        columns = list(zip(*updates, strict=True))
+        table = pa.table(
+            {
+                "checksum": pa.array(columns[0], pa.string()),
+                "file_size": pa.array(columns[1], pa.int64()),
+                "mtime_ns": pa.array(columns[2], pa.int64()),
+                "inode": pa.array(columns[3], pa.uint64()),
+                "device": pa.array(columns[4], pa.uint64()),
+                "path": pa.array(columns[5], pa.string()),
+                "filename": pa.array(columns[6], pa.string()),
+            }
+        )
+        self._update_from_arrow(
+            table,
+            f"""checksum = u.checksum,
+            modification_datetime = {MTIME_NS_TO_TIMESTAMP.format("u.mtime_ns")},
+            file_size = u.file_size,
+            mtime_ns = u.mtime_ns,
+            inode = u.inode,
+            device = u.device""",
+            indexed_at,
+        )
+
+    def _bulk_update_checksums_arrow(self, updates: list, indexed_at: datetime) -> None:
+        """Apply (checksum, path, filename) updates via one Arrow join."""
+        columns = list(zip(*updates, strict=True))
+        table = pa.table(
+            {
+                "checksum": pa.array(columns[0], pa.string()),
+                "path": pa.array(columns[1], pa.string()),
+                "filename": pa.array(columns[2], pa.string()),
+            }
+        )
+        self._update_from_arrow(table, "checksum = u.checksum", indexed_at)
+
+    def _update_from_arrow(
+        self, table: Any, assignments: str, indexed_at: datetime
+    ) -> None:
+        """Run a single UPDATE ... FROM an Arrow table keyed by (path, filename)."""
+        self.conn.register("incoming_updates", table)
+        try:
+            self.conn.execute(
+                f"""
+                UPDATE files
+                SET {assignments},
+                    indexed_at = ?
+                FROM incoming_updates u
+                WHERE files.path = u.path AND files.filename = u.filename
+                """,
+                [indexed_at],
+            )
+        finally:
+            self.conn.unregister("incoming_updates")
+
     def update_database(
         self, directory_path: str, recursive: bool = True, batch_size: int = 1000
     ) -> None:
@@ -463,6 +1171,10 @@ class FileIndexer:
             f"Configuration: max_checksum_size={self.max_checksum_size:,} bytes, skip_empty_files={self.skip_empty_files}"
         )
 
+        # Phase 1 of two-phase indexing (negative size limit) hashes nothing
+        if self.max_checksum_size >= 0:
+            self._require_hash_algorithm()
+
         # Reset only per-scan counters (not cumulative performance counters)
         self.ignored_symlinks = 0
         self.ignored_special_files = 0
@@ -471,35 +1183,51 @@ class FileIndexer:
         self.permission_errors = 0
 
         # Process files in batches to manage memory usage
-        file_generator = self.scan_directory_generator(directory_path, recursive)
+        file_entries = self._iter_file_entries(directory_path, recursive)
 
         total_processed = 0
         total_added = 0
         total_updated = 0
         total_errors = 0
 
-        # Process files in batches
-        batch = []
-        for file_path in file_generator:
-            batch.append(file_path)
+        # Into an empty table, building the secondary indexes once afterwards
+        # is cheaper than maintaining them per batch. Re-scans keep them, as a
+        # rebuild would read the whole table for a few changed rows.
+        bulk_load = self.conn.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None
+        if bulk_load:
+            self._drop_indexes()
 
-            if len(batch) >= batch_size:
-                added, updated, errors = self._process_batch(batch)
+        try:
+            # Process files in batches, keeping the stat result from the scan
+            batch = []
+            batch_stats: dict[str, os.stat_result] = {}
+            for entry in file_entries:
+                batch.append(entry.path)
+                # On failure the file is stat-ed again (and reported) while processing
+                with contextlib.suppress(OSError):
+                    batch_stats[entry.path] = entry.stat(follow_symlinks=False)
+
+                if len(batch) >= batch_size:
+                    added, updated, errors = self._process_batch(batch, batch_stats)
+                    total_processed += len(batch)
+                    total_added += added
+                    total_updated += updated
+                    total_errors += errors
+
+                    print(f"Processed {total_processed} files...")
+                    batch = []
+                    batch_stats = {}
+
+            # Process remaining files in the last batch
+            if batch:
+                added, updated, errors = self._process_batch(batch, batch_stats)
                 total_processed += len(batch)
                 total_added += added
                 total_updated += updated
                 total_errors += errors
-
-                print(f"Processed {total_processed} files...")
-                batch = []
-
-        # Process remaining files in the last batch
-        if batch:
-            added, updated, errors = self._process_batch(batch)
-            total_processed += len(batch)
-            total_added += added
-            total_updated += updated
-            total_errors += errors
+        finally:
+            if bulk_load:
+                self._create_indexes()
 
         print(
             f"Completed! Processed: {total_processed}, Added: {total_added}, Updated: {total_updated}, Skipped: {self.skipped_files}, Errors: {total_errors}"
@@ -528,19 +1256,35 @@ class FileIndexer:
                 f"Performance: Calculated {self.checksum_calculations} checksums, reused {self.checksum_reuses} ({optimization_pct:.1f}% optimization)"
             )
 
-    def _process_batch(self, file_paths: list[str]) -> tuple[int, int, int]:
-        """Process a batch of files with improved error handling."""
+    def _process_batch(
+        self,
+        file_paths: list[str],
+        stat_results: dict[str, os.stat_result] | None = None,
+    ) -> tuple[int, int, int]:
+        """
+        Process a batch of files with improved error handling.
+        stat_results optionally maps paths to stat results already taken while scanning.
+        """
         try:
             # Get existing file records in bulk
             existing_files = self._get_existing_files_bulk(file_paths)
 
             # Determine which files need processing (with individual file error handling)
             files_needing_checksums, files_to_update, files_to_insert = (
-                self._process_files_batch(file_paths, existing_files)
+                self._process_files_batch(file_paths, existing_files, stat_results)
             )
 
-            # Calculate checksums in parallel
-            checksums = self._calculate_checksums_parallel(files_needing_checksums)
+            # Calculate checksums in parallel, reusing cached ones where possible
+            needs_stat = {
+                file_path: stat_info
+                for file_path, _, _, stat_info, needs_checksum in itertools.chain(
+                    files_to_insert, files_to_update
+                )
+                if needs_checksum
+            }
+            checksums = self._calculate_checksums_cached(
+                files_needing_checksums, needs_stat
+            )
 
             # Prepare database operations
             insert_data = []
@@ -550,8 +1294,7 @@ class FileIndexer:
                 file_path,
                 directory,
                 filename,
-                mod_time,
-                file_size,
+                stat_info,
                 needs_checksum,
             ) in files_to_insert:
                 if needs_checksum:
@@ -562,15 +1305,22 @@ class FileIndexer:
                     checksum = None  # Explicitly set to NULL for large/empty files
 
                 insert_data.append(
-                    (directory, filename, checksum, mod_time.isoformat(), file_size)
+                    (
+                        directory,
+                        filename,
+                        checksum,
+                        stat_info.st_size,
+                        stat_info.st_mtime_ns,
+                        stat_info.st_ino,
+                        stat_info.st_dev,
+                    )
                 )
 
             for (
                 file_path,
                 directory,
                 filename,
-                mod_time,
-                file_size,
+                stat_info,
                 needs_checksum,
             ) in files_to_update:
                 if needs_checksum:
@@ -581,7 +1331,15 @@ class FileIndexer:
                     checksum = None  # Explicitly set to NULL for large/empty files
 
                 update_data.append(
-                    (checksum, mod_time.isoformat(), file_size, directory, filename)
+                    (
+                        checksum,
+                        stat_info.st_size,
+                        stat_info.st_mtime_ns,
+                        stat_info.st_ino,
+                        stat_info.st_dev,
+                        directory,
+                        filename,
+                    )
                 )
 
             # Perform bulk database operations
@@ -607,6 +1365,15 @@ class FileIndexer:
         updated = 0
         errors = 0
 
+        # Look up stored rows for the whole batch at once; only the writes
+        # below stay per file so one bad row cannot fail the others
+        existing_files: dict[tuple[str, str], FileRecord] | None
+        try:
+            existing_files = self._get_existing_files_bulk(file_paths)
+        except Exception as e:
+            print(f"Bulk lookup failed, querying files one by one: {e}")
+            existing_files = None
+
         for file_path in file_paths:
             try:
                 # Process single file using the legacy method for reliability
@@ -615,47 +1382,44 @@ class FileIndexer:
                 filename = path_obj.name
 
                 # Check if file already exists in database
-                existing = self.conn.execute(
-                    """
-                    SELECT checksum, modification_datetime, file_size
-                    FROM files
-                    WHERE path = ? AND filename = ?
-                """,
-                    [directory, filename],
-                ).fetchone()
+                existing: FileRecord | None
+                if existing_files is not None:
+                    existing = existing_files.get((directory, filename))
+                else:
+                    row = self.conn.execute(
+                        f"""
+                        SELECT {FILE_RECORD_COLUMNS}
+                        FROM files
+                        WHERE path = ? AND filename = ?
+                    """,
+                        [directory, filename],
+                    ).fetchone()
+                    existing = FileRecord(*row) if row else None
 
                 # Get file info (only calculates checksum if needed)
-                file_info = self._get_file_info(
-                    file_path, (existing[0], existing[1]) if existing else None
-                )
+                file_info = self._get_file_info_and_stat(file_path, existing)
 
                 if not file_info:
                     errors += 1
                     continue
 
-                directory, filename, checksum, modification_datetime, file_size = (
-                    file_info
-                )
+                (directory, filename, checksum, _, file_size), stat_info = file_info
 
                 if existing:
-                    existing_checksum, existing_mod_time, existing_size = existing
                     # Check if anything has changed
-                    if (
-                        checksum != existing_checksum
-                        or modification_datetime != existing_mod_time
-                        or file_size != existing_size
+                    if checksum != existing.checksum or not _record_unchanged(
+                        stat_info, existing
                     ):
                         # Update record
                         self.conn.execute(
-                            """
-                            UPDATE files
-                            SET checksum = ?, modification_datetime = ?, file_size = ?, indexed_at = CURRENT_TIMESTAMP
-                            WHERE path = ? AND filename = ?
-                        """,
+                            UPDATE_FILE_SQL,
                             [
                                 checksum,
-                                modification_datetime.isoformat(),
                                 file_size,
+                                stat_info.st_mtime_ns,
+                                stat_info.st_ino,
+                                stat_info.st_dev,
+                                datetime.now(),
                                 directory,
                                 filename,
                             ],
@@ -667,16 +1431,18 @@ class FileIndexer:
                 else:
                     # Insert new file
                     self.conn.execute(
-                        """
-                        INSERT INTO files (path, filename, checksum, modification_datetime, file_size)
-                        VALUES (?, ?, ?, ?, ?)
+                        f"""
+                        INSERT INTO files (path, filename, checksum, modification_datetime, file_size, mtime_ns, inode, device)
+                        VALUES ($1, $2, $3, {MTIME_NS_TO_TIMESTAMP.format("$5")}, $4, $5, $6, $7)
                     """,
                         [
                             directory,
                             filename,
                             checksum,
-                            modification_datetime.isoformat(),
                             file_size,
+                            stat_info.st_mtime_ns,
+                            stat_info.st_ino,
+                            stat_info.st_dev,
                         ],
                     )
                     added += 1
@@ -694,26 +1460,15 @@ class FileIndexer:
 
         return added, updated, errors
 
-    def search_files(
+    def _build_search_query(
         self,
         filename_pattern: str | None = None,
         checksum: str | None = None,
         path_pattern: str | None = None,
         has_checksum: bool | None = None,
-    ) -> list[dict]:
-        """
-        Search for files in the database.
-
-        Args:
-            filename_pattern: SQL LIKE pattern for filename
-            checksum: Exact checksum to match
-            path_pattern: SQL LIKE pattern for path
-            has_checksum: Filter by whether files have checksums (True/False/None for all)
-
-        Returns:
-            List of matching file records
-        """
-        query = "SELECT * FROM files WHERE 1=1"
+    ) -> tuple[str, list[str]]:
+        """Build the SQL query and parameters shared by the search methods."""
+        query = f"SELECT {', '.join(FILE_COLUMNS)} FROM files WHERE 1=1"
         params = []
 
         if filename_pattern:
@@ -735,63 +1490,151 @@ class FileIndexer:
                 query += " AND checksum IS NULL"
 
         query += " ORDER BY path, filename"
+        return query, params
+
+    def search_files(
+        self,
+        filename_pattern: str | None = None,
+        checksum: str | None = None,
+        path_pattern: str | None = None,
+        has_checksum: bool | None = None,
+    ) -> list[dict]:
+        """
+        Search for files in the database.
+
+        Args:
+            filename_pattern: SQL LIKE pattern for filename
+            checksum: Exact checksum to match
+            path_pattern: SQL LIKE pattern for path
+            has_checksum: Filter by whether files have checksums (True/False/None for all)
+
+        Returns:
+            List of matching file records
+        """
+        query, params = self._build_search_query(
+            filename_pattern, checksum, path_pattern, has_checksum
+        )
+
+        if pa is not None:
+            # Arrow materializes the result columnar in C; convert to dicts once
+            result: list[dict] = (
+                self.conn.execute(query, params).fetch_arrow_table().to_pylist()
+            )
+            return result
 
         results = self.conn.execute(query, params).fetchall()
+        return [dict(zip(FILE_COLUMNS, row, strict=True)) for row in results]
 
-        columns = [
-            "path",
-            "filename",
-            "checksum",
-            "modification_datetime",
-            "file_size",
-            "indexed_at",
-        ]
-        return [dict(zip(columns, row, strict=True)) for row in results]
+    def search_files_arrow(
+        self,
+        filename_pattern: str | None = None,
+        checksum: str | None = None,
+        path_pattern: str | None = None,
+        has_checksum: bool | None = None,
+    ) -> Any:
+        """
+        Search for files in the database and return a pyarrow Table.
+
+        Takes the same filters as search_files(). Requires pyarrow.
+
+        Returns:
+            pyarrow.Table with one column per field in FILE_COLUMNS
+        """
+        if pa is None:
+            raise ImportError(
+                "pyarrow is required for Arrow results (pip install pyarrow)"
+            )
+
+        query, params = self._build_search_query(
+            filename_pattern, checksum, path_pattern, has_checksum
+        )
+        return self.conn.execute(query, params).fetch_arrow_table()
+
+    def search_files_streaming(
+        self,
+        filename_pattern: str | None = None,
+        checksum: str | None = None,
+        path_pattern: str | None = None,
+        has_checksum: bool | None = None,
+        batch_size: int = 1000,
+    ) -> Generator[list[dict], None, None]:
+        """
+        Search for files and yield matching records in batches.
+
+        Memory stays bounded by batch_size regardless of the result size.
+        Uses Arrow record batches when pyarrow is available.
+        """
+        query, params = self._build_search_query(
+            filename_pattern, checksum, path_pattern, has_checksum
+        )
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, params)
+
+            if pa is not None:
+                for record_batch in cursor.fetch_record_batch(batch_size):
+                    yield record_batch.to_pylist()
+                return
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [dict(zip(FILE_COLUMNS, row, strict=True)) for row in rows]
+        finally:
+            cursor.close()
 
     def find_duplicates_streaming(
         self, batch_size: int = 1000
     ) -> Generator[list[tuple], None, None]:
         """Find duplicate files and yield results in batches for immediate processing."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(DUPLICATES_QUERY)
 
-        # Optimized query using self-join
-        query = """
-            SELECT f1.path, f1.filename, f1.file_size, f1.checksum, f1.modification_datetime
-            FROM files f1
-            INNER JOIN files f2 ON f1.checksum = f2.checksum
-            WHERE f1.checksum IS NOT NULL
-            AND f1.rowid != f2.rowid
-            ORDER BY f1.checksum, f1.path, f1.filename
-        """
+            current_checksum = None
+            duplicate_group: list[tuple] = []
 
-        cursor = self.conn.cursor()
-        cursor.execute(query)
+            while True:
+                # Fetch results in batches to avoid loading everything into memory
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    # Yield the last group if it exists
+                    if duplicate_group:
+                        yield duplicate_group
+                    break
 
-        current_checksum = None
-        duplicate_group: list[tuple] = []
+                for row in batch:
+                    checksum = row[3]  # checksum column
 
-        while True:
-            # Fetch results in batches to avoid loading everything into memory
-            batch = cursor.fetchmany(batch_size)
-            if not batch:
-                # Yield the last group if it exists
-                if duplicate_group:
-                    yield duplicate_group
-                break
+                    if current_checksum != checksum:
+                        # New checksum group - yield the previous group
+                        if duplicate_group:
+                            yield duplicate_group
 
-            for row in batch:
-                checksum = row[3]  # checksum column
+                        # Start new group
+                        current_checksum = checksum
+                        duplicate_group = [row]
+                    else:
+                        # Same checksum - add to current group
+                        duplicate_group.append(row)
+        finally:
+            cursor.close()
 
-                if current_checksum != checksum:
-                    # New checksum group - yield the previous group
-                    if duplicate_group:
-                        yield duplicate_group
+    def find_duplicates_arrow(self) -> Any:
+        """
+        Return all duplicate files as a pyarrow Table, sorted by checksum.
 
-                    # Start new group
-                    current_checksum = checksum
-                    duplicate_group = [row]
-                else:
-                    # Same checksum - add to current group
-                    duplicate_group.append(row)
+        Columns: path, filename, file_size, checksum, modification_datetime.
+        Requires pyarrow.
+        """
+        if pa is None:
+            raise ImportError(
+                "pyarrow is required for Arrow results (pip install pyarrow)"
+            )
+
+        return self.conn.execute(DUPLICATES_QUERY).fetch_arrow_table()
 
     def find_duplicates(self) -> None:
         """Print duplicates as they're found, with progress indication."""
@@ -846,51 +1689,32 @@ class FileIndexer:
 
     def get_stats(self) -> dict:
         """Get database statistics including performance optimization metrics."""
-        stats = {}
-
-        # Total files
-        total_files_result = self.conn.execute("SELECT COUNT(*) FROM files").fetchone()
-        stats["total_files"] = total_files_result[0] if total_files_result else 0
-
-        # Total size
-        total_size_result = self.conn.execute(
-            "SELECT SUM(file_size) FROM files"
-        ).fetchone()
-        stats["total_size"] = (
-            total_size_result[0] if total_size_result and total_size_result[0] else 0
-        )
-
-        # Files with checksums
-        files_with_checksum_result = self.conn.execute(
-            "SELECT COUNT(*) FROM files WHERE checksum IS NOT NULL"
-        ).fetchone()
-        stats["files_with_checksum"] = (
-            files_with_checksum_result[0] if files_with_checksum_result else 0
-        )
-
-        # Files without checksums
-        stats["files_without_checksum"] = (
-            stats["total_files"] - stats["files_with_checksum"]
-        )
-
-        # Unique checksums (only count non-null checksums)
-        unique_checksums_result = self.conn.execute(
-            "SELECT COUNT(DISTINCT checksum) FROM files WHERE checksum IS NOT NULL"
-        ).fetchone()
-        stats["unique_checksums"] = (
-            unique_checksums_result[0] if unique_checksums_result else 0
+        stats: dict[str, Any] = {}
+
+        # All table aggregates in a single scan
+        result = self.conn.execute("""
+            SELECT
+                COUNT(*),
+                COALESCE(SUM(file_size), 0),
+                COUNT(checksum),
+                COUNT(DISTINCT checksum),
+                MAX(indexed_at)
+            FROM files
+        """).fetchone()
+        total_files, total_size, files_with_checksum, unique_checksums, last_indexed = (
+            result if result else (0, 0, 0, 0, None)
         )
 
+        stats["total_files"] = total_files
+        stats["total_size"] = total_size
+        stats["files_with_checksum"] = files_with_checksum
+        stats["files_without_checksum"] = total_files - files_with_checksum
+        # COUNT(DISTINCT ...) ignores NULL checksums
+        stats["unique_checksums"] = unique_checksums
         # Duplicate files (only among files with checksums)
-        stats["duplicate_files"] = (
-            stats["files_with_checksum"] - stats["unique_checksums"]
-        )
-
-        # Last indexed
-        last_indexed_result = self.conn.execute(
-            "SELECT MAX(indexed_at) FROM files"
-        ).fetchone()
-        stats["last_indexed"] = last_indexed_result[0] if last_indexed_result else None
+        stats["duplicate_files"] = files_with_checksum - unique_checksums
+        stats["last_indexed"] = last_indexed
+        stats["hash_algorithm"] = self.hash_algorithm
 
         # Performance statistics
         stats["checksum_calculations"] = self.checksum_calculations
@@ -946,6 +1770,29 @@ class FileIndexer:
         except OSError as e:
             return (False, f"Error checking directory {directory_path}: {e}")
 
+    def _list_directory_names(
+        self, directories: list[str]
+    ) -> dict[str, dict[str, os.DirEntry[str]] | None]:
+        """
+        Map each directory to its entries by name, or None when it cannot
+        be listed. With scan_workers > 1 the directories are listed
+        concurrently, which hides per-call latency on network filesystems.
+        """
+        if self.scan_workers > 1 and len(directories) > 1:
+            with ThreadPoolExecutor(
+                max_workers=self.scan_workers, thread_name_prefix="cleanup"
+            ) as executor:
+                listings = list(executor.map(_list_directory, directories))
+        else:
+            listings = [_list_directory(directory) for directory in directories]
+
+        return {
+            directory: None
+            if error is not None
+            else {entry.name: entry for entry in entries}
+            for directory, (entries, error) in zip(directories, listings, strict=True)
+        }
+
     def _mark_directory_files_as_deleted(
         self,
         directory_path: str,
@@ -1221,6 +2068,13 @@ class FileIndexer:
 
                 print(f"Checking {len(remaining_files):,} individual files...")
 
+                # One scandir per directory answers existence for all of its
+                # files; None marks directories that could not be listed, whose
+                # files are checked one by one instead
+                entries_by_directory = self._list_directory_names(
+                    list(directories_to_process_individually)
+                )
+
                 # Process in batches to avoid overwhelming the filesystem
                 for i in range(0, len(remaining_files), batch_size):
                     batch = remaining_files[i : i + batch_size]
@@ -1230,8 +2084,18 @@ class FileIndexer:
                         page_checked_files += 1
                         file_path = Path(directory_path) / filename
 
+                        entries = entries_by_directory[directory_path]
+
                         try:
-                            if not Path(file_path).exists():
+                            if entries is None:
+                                exists = file_path.exists()
+                            elif (entry := entries.get(filename)) is None:
+                                exists = False
+                            else:
+                                # Only a symlink needs a stat, as exists() follows
+                                # it: a broken one counts as deleted
+                                exists = not entry.is_symlink() or file_path.exists()
+                            if not exists:
                                 page_deleted_files.append((directory_path, filename))
                                 batch_deleted += 1
                                 page_files_deleted_individually += 1
@@ -1270,6 +2134,9 @@ class FileIndexer:
 
             page_num += 1
 
+        # Cached checksums of deleted files would otherwise accumulate forever
+        self._prune_checksum_cache()
+
         # Final summary
         print("\n=== Cleanup Summary ===")
         print(f"Total files checked: {total_checked_files:,}")
@@ -1432,11 +2299,14 @@ class FileIndexer:
         self.conn.execute("BEGIN TRANSACTION")
 
         try:
-            delete_sql = """
-            DELETE FROM files
-            WHERE path = ? AND filename = ?
-            """
-            self.conn.executemany(delete_sql, file_records)
+            if pa is not None:
+                self._delete_files_arrow(file_records)
+            else:
+                delete_sql = """
+                DELETE FROM files
+                WHERE path = ? AND filename = ?
+                """
+                self.conn.executemany(delete_sql, file_records)
             self.conn.execute("COMMIT")
 
         except Exception as e:
@@ -1444,8 +2314,28 @@ class FileIndexer:
             print(f"Database deletion failed: {e}")
             raise
 
+    def _delete_files_arrow(self, file_records: list[tuple[str, str]]) -> None:
+        """Delete (path, filename) records via one Arrow join."""
+        paths, filenames = zip(*file_records, strict=True)
+        table = pa.table(
+            {
+                "path": pa.array(paths, pa.string()),
+                "filename": pa.array(filenames, pa.string()),
+            }
+        )
+        self.conn.register("deleted_files", table)
+        try:
+            self.conn.execute("""
+            DELETE FROM files
+            USING deleted_files d
+            WHERE files.path = d.path AND files.filename = d.filename
+            """)
+        finally:
+            self.conn.unregister("deleted_files")
+
     def close(self) -> None:
-        """Close the database connection."""
+        """Close the database connection and stop the checksum worker pool."""
+        self._shutdown_checksum_pool()
         if self.conn:
             self.conn.close()
 
@@ -1475,6 +2365,44 @@ class FileIndexer:
 
         print("Phase 1 completed: All files indexed without checksums")
 
+    def _get_sizes_needing_checksums(self) -> list[tuple[int, int]]:
+        """
+        Find (file_size, file_count) for sizes shared by several files where at
+        least one file still lacks a checksum. Empty files are excluded when
+        skip_empty_files is set.
+        """
+        min_size = 1 if self.skip_empty_files else 0
+        return self.conn.execute(
+            f"{SIZES_NEEDING_CHECKSUMS_SQL} ORDER BY file_size", [min_size]
+        ).fetchall()
+
+    def _iter_files_needing_checksums(
+        self, batch_size: int
+    ) -> Generator[list[str], None, None]:
+        """
+        Yield batches of paths of files without checksums whose size is one of
+        _get_sizes_needing_checksums, from a single query ordered by size.
+        """
+        min_size = 1 if self.skip_empty_files else 0
+        # A separate cursor keeps the result streaming while batches are written
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                f"""
+                SELECT f.path, f.filename
+                FROM files f
+                JOIN ({SIZES_NEEDING_CHECKSUMS_SQL}) sizes
+                    ON f.file_size = sizes.file_size
+                WHERE f.checksum IS NULL
+                ORDER BY f.file_size, f.path, f.filename
+                """,
+                [min_size],
+            )
+            while rows := cursor.fetchmany(batch_size):
+                yield [str(Path(path) / filename) for path, filename in rows]
+        finally:
+            cursor.close()
+
     def calculate_checksums_for_duplicates(self, batch_size: int = 500) -> None:
         """
         Phase 2: Calculate checksums only for files that have the same size as other files.
@@ -1484,30 +2412,13 @@ class FileIndexer:
         Args:
             batch_size: Number of files to process checksums for in each batch
         """
+        self._require_hash_algorithm()
         print("Phase 2: Finding files with duplicate sizes...")
 
-        # Find all file sizes that have multiple files
-        # Exclude empty files if skip_empty_files is True
         if self.skip_empty_files:
-            duplicate_sizes_query = """
-            SELECT file_size, COUNT(*) as file_count
-            FROM files
-            WHERE file_size > 0
-            GROUP BY file_size
-            HAVING COUNT(*) > 1 AND SUM(CASE WHEN checksum IS NULL THEN 1 ELSE 0 END) > 0
-            ORDER BY file_size
-            """
             print("Skipping empty files in duplicate detection (skip_empty_files=True)")
-        else:
-            duplicate_sizes_query = """
-            SELECT file_size, COUNT(*) as file_count
-            FROM files
-            GROUP BY file_size
-            HAVING COUNT(*) > 1 AND SUM(CASE WHEN checksum IS NULL THEN 1 ELSE 0 END) > 0
-            ORDER BY file_size
-            """
 
-        duplicate_sizes = self.conn.execute(duplicate_sizes_query).fetchall()
+        duplicate_sizes = self._get_sizes_needing_checksums()
 
         if not duplicate_sizes:
             print("No files with duplicate sizes found. No checksums needed.")
@@ -1517,42 +2428,14 @@ class FileIndexer:
         print(f"Found {len(duplicate_sizes)} different file sizes with duplicates")
         print(f"Total files that need checksum calculation: {total_duplicate_files}")
 
-        # Process files by size groups
+        # One streamed query covers every size group
         total_processed = 0
         total_updated = 0
 
-        for file_size, file_count in duplicate_sizes:
-            print(f"Processing {file_count} files of size {file_size:,} bytes...")
-
-            # Get all files with this size that don't have checksums
-            # Apply the same empty file filtering as in the duplicate size query
-            if self.skip_empty_files and file_size == 0:
-                # Skip empty files - this shouldn't happen due to the outer query filter,
-                # but adding this as a safety check
-                continue
-
-            files_query = """
-            SELECT path, filename
-            FROM files
-            WHERE file_size = ? AND checksum IS NULL
-            ORDER BY path, filename
-            """
-
-            files_with_size = self.conn.execute(files_query, [file_size]).fetchall()
-            file_paths = [
-                str(Path(path) / filename) for path, filename in files_with_size
-            ]
-
-            # Process in batches
-            for i in range(0, len(file_paths), batch_size):
-                batch_paths = file_paths[i : i + batch_size]
-                updated_count = self._calculate_checksums_for_files(batch_paths)
-                total_updated += updated_count
-                total_processed += len(batch_paths)
-
-                print(
-                    f"  Processed {min(i + batch_size, len(file_paths))}/{len(file_paths)} files for this size"
-                )
+        for batch_paths in self._iter_files_needing_checksums(batch_size):
+            total_updated += self._calculate_checksums_for_files(batch_paths)
+            total_processed += len(batch_paths)
+            print(f"  Processed {total_processed:,} files without checksums")
 
         print(
             f"Phase 2 completed: Processed {total_processed} files, updated {total_updated} with checksums"
@@ -1593,24 +2476,53 @@ class FileIndexer:
         if not file_paths:
             return 0
 
-        # Filter out symlinks, special files, and empty files before checksum calculation
+        # Fetch the stored rows once to spot files changed since indexing
+        existing_files = self._get_existing_files_bulk(file_paths)
+
+        # One lstat per file filters out symlinks, special files and empty
+        # files, and is reused for the checksum cache and metadata updates
         valid_file_paths = []
+        stat_results: dict[str, os.stat_result] = {}
+        changed_metadata: dict[str, os.stat_result] = {}
+        get_existing = existing_files.get
         for file_path in file_paths:
-            # Use shared helper function with empty file checking
-            if self._should_process_file(file_path, check_empty_files=True):
-                valid_file_paths.append(file_path)
+            path_obj = Path(file_path)
+            try:
+                stat_info = os.lstat(file_path)
+            except OSError as e:
+                print(f"Error accessing file {file_path}: {e}")
+                continue
+
+            if stat.S_ISLNK(stat_info.st_mode):
+                self.ignored_symlinks += 1
+                continue
+            if not stat.S_ISREG(stat_info.st_mode):
+                self.ignored_special_files += 1
+                continue
+            if stat_info.st_size == 0 and self.skip_empty_files:
+                self.skipped_checksums += 1
+                continue
+
+            existing_record = get_existing((str(path_obj.parent), path_obj.name))
+            if existing_record and not _record_unchanged(stat_info, existing_record):
+                # File changed since it was indexed, refresh its metadata too
+                changed_metadata[file_path] = stat_info
+            stat_results[file_path] = stat_info
+            valid_file_paths.append(file_path)
 
         if not valid_file_paths:
             return 0
 
         # Calculate checksums in parallel for valid files only
-        checksums = self._calculate_checksums_parallel(valid_file_paths)
+        checksums = self._calculate_checksums_cached(valid_file_paths, stat_results)
 
         if not checksums:
             return 0
 
-        # Prepare database updates
+        # Prepare database updates, stamped with a single time for the batch
+        indexed_at = datetime.now()
         update_data = []
+        metadata_update_data = []
         for file_path in valid_file_paths:
             if file_path in checksums:
                 path_obj = Path(file_path)
@@ -1618,25 +2530,62 @@ class FileIndexer:
                 filename = path_obj.name
                 checksum = checksums[file_path]
 
-                # Update record with checksum (keep existing modification_datetime and file_size)
-                update_data.append((checksum, directory, filename))
+                if file_path in changed_metadata:
+                    stat_info = changed_metadata[file_path]
+                    metadata_update_data.append(
+                        (
+                            checksum,
+                            stat_info.st_size,
+                            stat_info.st_mtime_ns,
+                            stat_info.st_ino,
+                            stat_info.st_dev,
+                            directory,
+                            filename,
+                        )
+                    )
+                else:
+                    # Update record with checksum (keep existing modification_datetime and file_size)
+                    update_data.append((checksum, directory, filename))
 
-        if not update_data:
+        if not update_data and not metadata_update_data:
             return 0
 
         # Perform bulk database update
         self.conn.execute("BEGIN TRANSACTION")
 
         try:
-            update_sql = """
-            UPDATE files
-            SET checksum = ?, indexed_at = CURRENT_TIMESTAMP
-            WHERE path = ? AND filename = ?
-            """
-            self.conn.executemany(update_sql, update_data)
+            if update_data:
+                if pa is not None:
+                    self._bulk_update_checksums_arrow(update_data, indexed_at)
+                else:
+                    update_sql = """
+                    UPDATE files
+                    SET checksum = ?, indexed_at = ?
+                    WHERE path = ? AND filename = ?
+                    """
+                    self.conn.executemany(
+                        update_sql,
+                        [
+                            (checksum, indexed_at, directory, filename)
+                            for checksum, directory, filename in update_data
+                        ],
+                    )
+
+            if metadata_update_data:
+                if pa is not None:
+                    self._bulk_update_arrow(metadata_update_data, indexed_at)
+                else:
+                    self.conn.executemany(
+                        UPDATE_FILE_SQL,
+                        [
+                            (*row[:5], indexed_at, *row[5:])
+                            for row in metadata_update_data
+                        ],
+                    )
+
             self.conn.execute("COMMIT")
 
-            return len(update_data)
+            return len(update_data) + len(metadata_update_data)
 
         except Exception as e:
             self.conn.execute("ROLLBACK")
@@ -1656,6 +2605,8 @@ class FileIndexer:
             recursive: Whether to scan subdirectories recursively
             batch_size: Number of files to process in each batch
         """
+        # Fail before Phase 1 rather than after it
+        self._require_hash_algorithm()
         print("Starting two-phase indexing process...")
         print("=" * 50)
 
@@ -1692,42 +2643,54 @@ class FileIndexer:
 
     # Compatibility methods to maintain the same interface
     def _get_file_info(
-        self, file_path: str, existing_record: tuple | None = None
+        self, file_path: str, existing_record: FileRecord | None = None
     ) -> tuple[str, str, str | None, datetime, int] | None:
         """
         Get file information including path, filename, checksum, and modification time.
-        Maintains compatibility with the old interface but supports nullable checksums.
-        Filters out symlinks and special files.
+        Supports nullable checksums and filters out symlinks and special files.
         """
-        try:
-            # Use shared helper function
-            if not self._should_process_file(file_path):
-                return None
+        file_info = self._get_file_info_and_stat(file_path, existing_record)
+        return file_info[0] if file_info else None
 
+    def _get_file_info_and_stat(
+        self, file_path: str, existing_record: FileRecord | None = None
+    ) -> tuple[tuple[str, str, str | None, datetime, int], os.stat_result] | None:
+        """
+        Return _get_file_info's result together with the lstat result it is
+        based on, so callers that store the file need not stat it again.
+        """
+        try:
+            # One lstat both classifies the file and supplies its metadata
             path_obj = Path(file_path)
-            stat_info = path_obj.stat()
+            stat_info = os.lstat(file_path)
+            if stat.S_ISLNK(stat_info.st_mode):
+                self.ignored_symlinks += 1
+                return None
+            if not stat.S_ISREG(stat_info.st_mode):
+                self.ignored_special_files += 1
+                return None
 
             directory = str(path_obj.parent)
             filename = path_obj.name
-            modification_datetime = datetime.fromtimestamp(stat_info.st_mtime)
+            modification_datetime = _mtime_datetime(stat_info.st_mtime_ns)
             file_size = stat_info.st_size
 
-            # Check if we need to calculate checksum
-            if existing_record:
-                existing_checksum, existing_mod_time = existing_record
-                # If modification time hasn't changed, reuse existing checksum
-                if modification_datetime == existing_mod_time:
-                    if (
-                        existing_checksum is not None
-                    ):  # Only count as reuse if there was actually a checksum
-                        self.checksum_reuses += 1
-                    return (
+            # If the file hasn't changed, reuse the existing checksum
+            if existing_record and _record_unchanged(stat_info, existing_record):
+                if (
+                    existing_record.checksum is not None
+                ):  # Only count as reuse if there was actually a checksum
+                    self.checksum_reuses += 1
+                return (
+                    (
                         directory,
                         filename,
-                        existing_checksum,
+                        existing_record.checksum,
                         modification_datetime,
                         file_size,
-                    )
+                    ),
+                    stat_info,
+                )
 
             # File is new or modified
             if self._should_calculate_checksum(file_size):
@@ -1739,7 +2702,10 @@ class FileIndexer:
                 checksum = None  # Don't calculate checksum for large/empty files
                 self.skipped_checksums += 1
 
-            return (directory, filename, checksum, modification_datetime, file_size)
+            return (
+                (directory, filename, checksum, modification_datetime, file_size),
+                stat_info,
+            )
         except PermissionError:
             # Permission denied - return None and report
             print(f"Permission denied: {file_path}")
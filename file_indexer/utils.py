@@ -2,18 +2,19 @@
 Utility functions for the File Indexer.
 """
 
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
 
-def format_size(size_bytes: int) -> str:
+
+def format_size(size_bytes: float) -> str:
     """Format file size in human readable format."""
     if size_bytes == 0:
         return "0 B"
 
-    units = ["B", "KB", "MB", "GB", "TB"]
-    size = float(size_bytes)
-    unit_index = 0
-
-    while size >= 1024 and unit_index < len(units) - 1:
-        size /= 1024
-        unit_index += 1
+    # Each unit is 2**10 of the previous one, so the unit follows directly
+    # from the bit length instead of dividing in a loop. Floats are truncated
+    # for the bit length only; negative and sub-byte sizes stay in bytes.
+    whole_bytes = max(int(size_bytes), 1)
+    unit_index = min((whole_bytes.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    size = size_bytes / (1 << (10 * unit_index))
 
-    return f"{size:.1f} {units[unit_index]}"
+    return f"{size:.1f} {SIZE_UNITS[unit_index]}"
@@ -3,70 +3,111 @@ Tests for the file_indexer.cli module.
 """
 
 import sys
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 
 from file_indexer.cli import main, parse_size
 
 
+class FakeIndexer:
+    """Stand-in for FileIndexer that records which methods main() calls."""
+
+    instances: list["FakeIndexer"] = []
+
+    def __init__(self, db_path, **kwargs):
+        self.db_path = db_path
+        self.kwargs = kwargs
+        self.calls = []
+        FakeIndexer.instances.append(self)
+
+    def update_database(self, *args, **kwargs):
+        self.calls.append(("update_database", args, kwargs))
+
+    def two_phase_indexing(self, *args, **kwargs):
+        self.calls.append(("two_phase_indexing", args, kwargs))
+
+    def get_stats(self):
+        self.calls.append(("get_stats", (), {}))
+        return {
+            "total_files": 100,
+            "total_size": 1024000,
+            "files_with_checksum": 90,
+            "files_without_checksum": 10,
+            "unique_checksums": 85,
+            "duplicate_files": 5,
+            "last_indexed": "2024-01-01 12:00:00",
+            "hash_algorithm": "sha256",
+            "checksum_calculations": 0,
+            "checksum_reuses": 0,
+            "optimization_percentage": 0,
+        }
+
+    def search_files_streaming(self, *args, **kwargs):
+        self.calls.append(("search_files_streaming", args, kwargs))
+        for name in ("a.txt", "b.txt", "c.txt"):
+            yield [
+                {"path": "/data", "filename": name, "checksum": None, "file_size": 10}
+            ]
+
+    def close(self):
+        self.calls.append(("close", (), {}))
+
+
 class TestCLI:
     """Test cases for CLI functions."""
 
-    def test_parse_size_bytes(self):
-        """Test parsing size strings in bytes."""
-        assert parse_size("100") == 100
-        assert parse_size("100B") == 100
-        assert parse_size("0") == 0
-
-    def test_parse_size_kilobytes(self):
-        """Test parsing size strings in kilobytes."""
-        assert parse_size("1K") == 1024
-        assert parse_size("1KB") == 1024
-        assert parse_size("2KB") == 2048
-        assert parse_size("1.5KB") == 1536
-
-    def test_parse_size_megabytes(self):
-        """Test parsing size strings in megabytes."""
-        assert parse_size("1M") == 1024 * 1024
-        assert parse_size("1MB") == 1024 * 1024
-        assert parse_size("100MB") == 100 * 1024 * 1024
-        assert parse_size("1.5MB") == int(1.5 * 1024 * 1024)
-
-    def test_parse_size_gigabytes(self):
-        """Test parsing size strings in gigabytes."""
-        assert parse_size("1G") == 1024 * 1024 * 1024
-        assert parse_size("1GB") == 1024 * 1024 * 1024
-        assert parse_size("2GB") == 2 * 1024 * 1024 * 1024
-
-    def test_parse_size_terabytes(self):
-        """Test parsing size strings in terabytes."""
-        assert parse_size("1T") == 1024 * 1024 * 1024 * 1024
-        assert parse_size("1TB") == 1024 * 1024 * 1024 * 1024
-
-    def test_parse_size_invalid(self):
+    @pytest.mark.parametrize(
+        "size_str, expected",
+        [
+            # Bytes
+            ("100", 100),
+            ("100B", 100),
+            ("0", 0),
+            # Kilobytes
+            ("1K", 1024),
+            ("1KB", 1024),
+            ("2KB", 2048),
+            ("1.5KB", 1536),
+            # Megabytes
+            ("1M", 1024 * 1024),
+            ("1MB", 1024 * 1024),
+            ("100MB", 100 * 1024 * 1024),
+            ("1.5MB", int(1.5 * 1024 * 1024)),
+            # Gigabytes
+            ("1G", 1024 * 1024 * 1024),
+            ("1GB", 1024 * 1024 * 1024),
+            ("2GB", 2 * 1024 * 1024 * 1024),
+            # Terabytes
+            ("1T", 1024 * 1024 * 1024 * 1024),
+            ("1TB", 1024 * 1024 * 1024 * 1024),
+            # Case insensitive
+            ("100mb", 100 * 1024 * 1024),
+            ("1gb", 1024 * 1024 * 1024),
+            ("1Mb", 1024 * 1024),
+        ],
+    )
+    def test_parse_size(self, size_str, expected):
+        """Test parsing valid size strings."""
+        assert parse_size(size_str) == expected
+
+    @pytest.mark.parametrize(
+        "size_str",
+        [
+            "invalid",
+            "100XB",  # Invalid unit
+            "abc123",  # Invalid format
+        ],
+    )
+    def test_parse_size_invalid(self, size_str):
         """Test parsing invalid size strings."""
         with pytest.raises(ValueError):
-            parse_size("invalid")
+            parse_size(size_str)
 
-        with pytest.raises(ValueError):
-            parse_size("100XB")  # Invalid unit
-
-        with pytest.raises(ValueError):
-            parse_size("abc123")  # Invalid format
-
-    def test_parse_size_case_insensitive(self):
-        """Test that size parsing is case insensitive."""
-        assert parse_size("100mb") == 100 * 1024 * 1024
-        assert parse_size("1gb") == 1024 * 1024 * 1024
-        assert parse_size("1Mb") == 1024 * 1024
-
-    @patch("file_indexer.cli.FileIndexer")
-    def test_main_scan_operation(self, mock_indexer_class):
+    def test_main_scan_operation(self, monkeypatch):
         """Test main function with scan operation."""
-        # Mock the FileIndexer class
-        mock_indexer = MagicMock()
-        mock_indexer_class.return_value = mock_indexer
+        FakeIndexer.instances = []
+        monkeypatch.setattr("file_indexer.cli.FileIndexer", FakeIndexer)
 
         # Test arguments
         test_args = [
@@ -78,67 +119,68 @@ class TestCLI:
         ]
 
         with patch.object(sys, "argv", test_args):
-            try:
-                main()
-                # Verify that FileIndexer was called with correct arguments
-                mock_indexer_class.assert_called_once()
-                mock_indexer.update_database.assert_called_once()
-                mock_indexer.close.assert_called_once()
-            except SystemExit as e:
-                # Exit code 0 is success
-                assert e.code == 0
-
-    @patch("file_indexer.cli.FileIndexer")
-    def test_main_stats_operation(self, mock_indexer_class):
+            main()
+
+        # Verify that FileIndexer was created once and used as expected
+        assert len(FakeIndexer.instances) == 1
+        indexer = FakeIndexer.instances[0]
+        assert indexer.db_path == "test.db"
+        assert indexer.calls == [
+            ("update_database", ("/test/dir", True), {"batch_size": 1000}),
+            ("close", (), {}),
+        ]
+
+    def test_main_stats_operation(self, monkeypatch):
         """Test main function with stats operation."""
-        # Mock the FileIndexer class
-        mock_indexer = MagicMock()
-        mock_indexer.get_stats.return_value = {
-            "total_files": 100,
-            "total_size": 1024000,
-            "files_with_checksum": 90,
-            "files_without_checksum": 10,
-            "unique_checksums": 85,
-            "duplicate_files": 5,
-            "last_indexed": "2024-01-01 12:00:00",
-            "checksum_calculations": 0,
-            "checksum_reuses": 0,
-            "optimization_percentage": 0,
-        }
-        mock_indexer_class.return_value = mock_indexer
+        FakeIndexer.instances = []
+        monkeypatch.setattr("file_indexer.cli.FileIndexer", FakeIndexer)
 
         # Test arguments
         test_args = ["file-indexer", "--stats", "--db", "test.db"]
 
         with patch.object(sys, "argv", test_args):
-            try:
-                main()
-                # Verify that get_stats was called
-                mock_indexer.get_stats.assert_called_once()
-                mock_indexer.close.assert_called_once()
-            except SystemExit as e:
-                # Exit code 0 is success
-                assert e.code == 0
-
-    @patch("file_indexer.cli.FileIndexer")
-    def test_main_two_phase_operation(self, mock_indexer_class):
+            main()
+
+        # Verify that get_stats was called
+        assert FakeIndexer.instances[0].calls == [
+            ("get_stats", (), {}),
+            ("close", (), {}),
+        ]
+
+    def test_main_two_phase_operation(self, monkeypatch):
         """Test main function with two-phase operation."""
-        # Mock the FileIndexer class
-        mock_indexer = MagicMock()
-        mock_indexer_class.return_value = mock_indexer
+        FakeIndexer.instances = []
+        monkeypatch.setattr("file_indexer.cli.FileIndexer", FakeIndexer)
 
         # Test arguments
         test_args = ["file-indexer", "--two-phase", "/test/dir", "--db", "test.db"]
 
         with patch.object(sys, "argv", test_args):
-            try:
-                main()
-                # Verify that two_phase_indexing was called
-                mock_indexer.two_phase_indexing.assert_called_once()
-                mock_indexer.close.assert_called_once()
-            except SystemExit as e:
-                # Exit code 0 is success
-                assert e.code == 0
+            main()
+
+        # Verify that two_phase_indexing was called
+        assert FakeIndexer.instances[0].calls == [
+            ("two_phase_indexing", ("/test/dir", True), {"batch_size": 1000}),
+            ("close", (), {}),
+        ]
+
+    def test_main_search_operation(self, monkeypatch, capsys):
+        """Test that search streams the results and then prints their count."""
+        FakeIndexer.instances = []
+        monkeypatch.setattr("file_indexer.cli.FileIndexer", FakeIndexer)
+
+        test_args = ["file-indexer", "--search-filename", "%.txt", "--db", "test.db"]
+
+        with patch.object(sys, "argv", test_args):
+            main()
+
+        assert capsys.readouterr().out.splitlines() == [
+            "Matching files:",
+            "  /data/a.txt (checksum: None, size: 10.0 B)",
+            "  /data/b.txt (checksum: None, size: 10.0 B)",
+            "  /data/c.txt (checksum: None, size: 10.0 B)",
+            "Found 3 matching files.",
+        ]
 
     def test_main_help(self):
         """Test that help argument works."""
@@ -2,6 +2,9 @@
 Tests for the FileIndexer class.
 """
 
+import hashlib
+import os
+import stat
 import tempfile
 from datetime import datetime
 from pathlib import Path
@@ -11,6 +14,15 @@ import pytest
 from file_indexer.indexer import FileIndexer
 
 
+@pytest.fixture(params=[True, False], ids=["arrow", "no-arrow"])
+def use_arrow(request, monkeypatch):
+    """Run a test with and without pyarrow, covering both bulk code paths."""
+    if request.param:
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr("file_indexer.indexer.pa", None)
+
+
 class TestFileIndexer:
     """Test cases for FileIndexer functionality."""
 
@@ -73,12 +85,35 @@ class TestFileIndexer:
         assert len(files) == 5
 
         # Check that all expected files are found
-        file_names = [Path(f).name for f in files]
-        assert "test1.txt" in file_names
-        assert "test2.txt" in file_names
-        assert "duplicate.txt" in file_names
-        assert "test3.txt" in file_names
-        assert "empty.txt" in file_names
+        assert {Path(f).name for f in files} == {
+            "test1.txt",
+            "test2.txt",
+            "duplicate.txt",
+            "test3.txt",
+            "empty.txt",
+        }
+
+    def test_scan_directory_threaded(self):
+        """Test that a threaded scan finds the same files as a sequential one."""
+        nested = self.subdir / "nested"
+        nested.mkdir()
+        (nested / "deep.txt").write_text("Nested file")
+        try:
+            (self.subdir / "link_to_root").symlink_to(self.test_files_dir)
+            (nested / "link_to_file").symlink_to(self.test_file1)
+        except (OSError, NotImplementedError):
+            pytest.skip("Symbolic links not supported on this platform")
+
+        expected = self.indexer.scan_directory(self.test_files_dir, recursive=True)
+
+        threaded = FileIndexer(str(self.db_path) + "_threaded", scan_workers=4)
+        try:
+            files = threaded.scan_directory(self.test_files_dir, recursive=True)
+            assert sorted(files) == sorted(expected)
+            assert len(files) == 6
+            assert threaded.ignored_symlinks == self.indexer.ignored_symlinks == 1
+        finally:
+            threaded.close()
 
     def test_scan_directory_non_recursive(self):
         """Test scanning a directory non-recursively."""
@@ -87,13 +122,16 @@ class TestFileIndexer:
         # Should find 4 files (excluding subdirectory)
         assert len(files) == 4
 
-        # Check that subdirectory file is not included
-        file_names = [Path(f).name for f in files]
-        assert "test1.txt" in file_names
-        assert "test2.txt" in file_names
-        assert "duplicate.txt" in file_names
-        assert "empty.txt" in file_names
-        assert "test3.txt" not in file_names
+        # Check that subdirectory file (test3.txt) is not included
+        assert {Path(f).name for f in files} == {
+            "test1.txt",
+            "test2.txt",
+            "duplicate.txt",
+            "empty.txt",
+        }
+
+        # Skipped subdirectories are not counted as special files
+        assert self.indexer.ignored_special_files == 0
 
     def test_scan_nonexistent_directory(self):
         """Test scanning a non-existent directory."""
@@ -146,6 +184,36 @@ class TestFileIndexer:
         assert len(results) == 1
         assert results[0]["filename"] == "test3.txt"
 
+    def test_search_files_streaming(self):
+        """Test that streaming search yields the same records in batches."""
+        self.indexer.update_database(self.test_files_dir, recursive=True)
+
+        batches = list(
+            self.indexer.search_files_streaming(filename_pattern="%.txt", batch_size=2)
+        )
+        assert all(len(batch) <= 2 for batch in batches)
+
+        streamed = [record for batch in batches for record in batch]
+        assert streamed == self.indexer.search_files(filename_pattern="%.txt")
+        assert len(streamed) == 5
+
+    def test_search_files_arrow(self):
+        """Test that Arrow search returns a table with the file columns."""
+        pytest.importorskip("pyarrow")
+        self.indexer.update_database(self.test_files_dir, recursive=True)
+
+        table = self.indexer.search_files_arrow(path_pattern="%subdir%")
+        assert table.num_rows == 1
+        assert table.column_names == [
+            "path",
+            "filename",
+            "checksum",
+            "modification_datetime",
+            "file_size",
+            "indexed_at",
+        ]
+        assert table.column("filename").to_pylist() == ["test3.txt"]
+
     def test_search_files_by_checksum_presence(self):
         """Test searching files by checksum presence."""
         self.indexer.update_database(self.test_files_dir, recursive=True)
@@ -204,6 +272,37 @@ class TestFileIndexer:
         for dup in duplicates:
             assert dup["checksum"] is not None
 
+    def test_find_duplicates_lists_each_copy_once(self):
+        """Test that groups with more than two copies list every file once."""
+        (Path(self.test_files_dir) / "third.txt").write_text("Hello World")
+        self.indexer.update_database(self.test_files_dir, recursive=True)
+
+        groups = list(self.indexer.find_duplicates_streaming())
+        assert len(groups) == 1
+        assert sorted(row[1] for row in groups[0]) == [
+            "duplicate.txt",
+            "test1.txt",
+            "third.txt",
+        ]
+
+    def test_find_duplicates_arrow(self):
+        """Test duplicate results as a pyarrow Table."""
+        pytest.importorskip("pyarrow")
+        self.indexer.update_database(self.test_files_dir, recursive=True)
+
+        table = self.indexer.find_duplicates_arrow()
+        assert table.column_names == [
+            "path",
+            "filename",
+            "file_size",
+            "checksum",
+            "modification_datetime",
+        ]
+        assert sorted(table.column("filename").to_pylist()) == [
+            "duplicate.txt",
+            "test1.txt",
+        ]
+
     def test_calculate_checksum(self):
         """Test checksum calculation."""
         checksum1 = self.indexer._calculate_checksum(str(self.test_file1))
@@ -218,7 +317,114 @@ class TestFileIndexer:
 
         # Checksums should be valid hex strings
         assert len(checksum1) == 64  # SHA256 produces 64-character hex string
-        assert all(c in "0123456789abcdef" for c in checksum1)
+        # Round-trips only for lowercase hex without separators
+        assert bytes.fromhex(checksum1).hex() == checksum1
+
+        # SHA-256 matches the digest of the known file content
+        assert (
+            self.indexer._calculate_checksum(str(self.test_file1), "sha256")
+            == hashlib.sha256(b"Hello World").hexdigest()
+        )
+
+    @pytest.mark.parametrize(
+        ("algorithm", "package", "digest_length"),
+        [("blake3", "blake3", 64), ("xxh3_128", "xxhash", 32)],
+    )
+    def test_calculate_checksum_fast_algorithms(
+        self, algorithm, package, digest_length
+    ):
+        """Test checksum calculation with the optional fast hash algorithms."""
+        pytest.importorskip(package)
+        self.indexer.close()
+        self.indexer = FileIndexer(str(self.db_path), hash_algorithm=algorithm)
+
+        checksum1 = self.indexer._calculate_checksum(str(self.test_file1))
+        checksum3 = self.indexer._calculate_checksum(str(self.test_file3))
+        assert checksum1 == checksum3
+        assert len(checksum1) == digest_length
+        assert checksum1 != self.indexer._calculate_checksum(
+            str(self.test_file1), "sha256"
+        )
+
+    def test_invalid_hash_algorithm(self):
+        """Test that unknown hash algorithms are rejected up front."""
+        with pytest.raises(ValueError, match="Unknown checksum algorithm"):
+            FileIndexer(str(self.db_path), hash_algorithm="not-a-hash")
+
+    def test_calculate_checksum_large_and_small_files(self):
+        """Test hashing files larger and smaller than the read buffer."""
+        large_content = bytes(range(256)) * (3 * 1024 * 1024 // 256 + 7)
+        large_file = Path(self.test_files_dir) / "large.bin"
+        large_file.write_bytes(large_content)
+
+        assert (
+            self.indexer._calculate_checksum(str(large_file), "sha256")
+            == hashlib.sha256(large_content).hexdigest()
+        )
+        assert (
+            self.indexer._calculate_checksum(str(self.test_file1), "sha256")
+            == hashlib.sha256(self.test_file1.read_bytes()).hexdigest()
+        )
+
+    def test_hash_algorithm_recorded_in_database(self):
+        """Test that a database keeps the algorithm its checksums use."""
+        self.indexer.close()
+        self.indexer = FileIndexer(str(self.db_path), hash_algorithm="sha256")
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        self.indexer.close()
+
+        # Reopening without an explicit algorithm reuses the recorded one
+        self.indexer = FileIndexer(str(self.db_path))
+        assert self.indexer.hash_algorithm == "sha256"
+        assert self.indexer.get_stats()["hash_algorithm"] == "sha256"
+
+        # Switching algorithms on a database with checksums is rejected
+        with pytest.raises(ValueError, match="Database checksums use 'sha256'"):
+            FileIndexer(str(self.db_path), hash_algorithm="md5")
+
+    def test_hash_algorithm_for_legacy_database(self):
+        """Test that databases without a recorded algorithm assume SHA-256."""
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        self.indexer.conn.execute("DELETE FROM index_metadata")
+        self.indexer.close()
+
+        self.indexer = FileIndexer(str(self.db_path))
+        assert self.indexer.hash_algorithm == "sha256"
+
+    def test_hash_algorithm_for_go_indexer_database(self):
+        """Test that unrecorded 32-digit checksums, as the Go indexer writes, are MD5."""
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        self.indexer.conn.execute("DELETE FROM index_metadata")
+        self.indexer.conn.execute(
+            "UPDATE files SET checksum = md5(filename) WHERE checksum IS NOT NULL"
+        )
+        self.indexer.close()
+
+        self.indexer = FileIndexer(str(self.db_path))
+        assert self.indexer.hash_algorithm == "md5"
+        assert self.indexer._calculate_checksum(str(self.test_file1)) == (
+            hashlib.md5(b"Hello World").hexdigest()
+        )
+
+    def test_missing_hash_algorithm_only_blocks_hashing(self, monkeypatch):
+        """Test that a database needs its algorithm's package only to hash."""
+        from file_indexer.indexer import OPTIONAL_HASH_ALGORITHMS
+
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        self.indexer.conn.execute(
+            "UPDATE index_metadata SET value = 'blake3' WHERE key = 'hash_algorithm'"
+        )
+        self.indexer.close()
+        monkeypatch.setitem(OPTIONAL_HASH_ALGORITHMS, "blake3", ("blake3", None))
+
+        self.indexer = FileIndexer(str(self.db_path))
+        assert self.indexer.get_stats()["hash_algorithm"] == "blake3"
+        assert self.indexer.search_files(filename_pattern="test1.txt")
+        self.indexer.index_files_without_checksums(self.test_files_dir)
+        with pytest.raises(ValueError, match="requires the 'blake3' package"):
+            self.indexer.update_database(self.test_files_dir)
+        with pytest.raises(ValueError, match="requires the 'blake3' package"):
+            self.indexer.calculate_checksums_for_duplicates()
 
     def test_checksum_nonexistent_file(self):
         """Test checksum calculation for non-existent file."""
@@ -237,6 +443,46 @@ class TestFileIndexer:
         assert isinstance(mod_time, datetime)
         assert file_size > 0
 
+    def test_process_batch_individually_stats_once(self, monkeypatch):
+        """
+        Test that the per-file fallback reuses _get_file_info's stat result.
+        The only other stat is the checksum worker's check before opening.
+        """
+        stat_calls = []
+        for name in ("stat", "lstat"):
+            real_stat = getattr(os, name)
+
+            def counting_stat(path, *args, _real=real_stat, **kwargs):
+                stat_calls.append(str(path))
+                return _real(path, *args, **kwargs)
+
+            monkeypatch.setattr(os, name, counting_stat)
+        added, updated, errors = self.indexer._process_batch_individually(
+            [str(self.test_file1)]
+        )
+
+        assert (added, updated, errors) == (1, 0, 0)
+        assert stat_calls == [str(self.test_file1)] * 2
+
+    def test_get_file_info_reuses_unchanged_record(self):
+        """Test that an unchanged stored record's checksum is reused."""
+        from file_indexer.indexer import FileRecord
+
+        file_stat = self.test_file1.stat()
+        record = FileRecord(
+            "stored",
+            datetime.fromtimestamp(file_stat.st_mtime),
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+            file_stat.st_ino,
+        )
+
+        info = self.indexer._get_file_info(str(self.test_file1), record)
+        assert info is not None
+        assert info[2] == "stored"
+        assert self.indexer.checksum_reuses == 1
+        assert self.indexer.checksum_calculations == 0
+
     def test_get_file_info_nonexistent(self):
         """Test getting file info for non-existent file."""
         info = self.indexer._get_file_info("/nonexistent/file.txt")
@@ -274,8 +520,14 @@ class TestFileIndexer:
         assert updated_stats["total_files"] == initial_stats["total_files"]
         assert updated_stats["last_indexed"] > initial_stats["last_indexed"]
 
-    def test_checksum_optimization(self):
+    @pytest.mark.parametrize("checksum_executor", ["thread", "process"])
+    def test_checksum_optimization(self, checksum_executor):
         """Test that checksum calculation is optimized for unchanged files."""
+        self.indexer.close()
+        self.indexer = FileIndexer(
+            str(self.db_path), checksum_executor=checksum_executor
+        )
+
         # Reset counters
         self.indexer.reset_optimization_counters()
 
@@ -306,6 +558,51 @@ class TestFileIndexer:
         else:
             assert self.indexer.checksum_reuses == 4  # All 4 files reused checksums
 
+    def test_change_detection_uses_mtime_ns(self):
+        """Test that sub-microsecond mtime changes are detected via mtime_ns."""
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        file_stat = self.test_file1.stat()
+
+        # Same size and same microsecond, but a different nanosecond mtime
+        os.utime(self.test_file1, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1))
+        if self.test_file1.stat().st_mtime_ns == file_stat.st_mtime_ns:
+            pytest.skip("Filesystem does not store nanosecond timestamps")
+
+        self.indexer.reset_optimization_counters()
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        assert self.indexer.checksum_calculations == 1
+
+    @pytest.mark.parametrize("rounded", [True, False], ids=["rounded", "truncated"])
+    def test_change_detection_for_rows_without_mtime_ns(self, rounded):
+        """Test that rows indexed before mtime_ns existed still reuse checksums."""
+        from file_indexer.indexer import _mtime_datetime
+
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        # Older versions stored only datetime.fromtimestamp(st_mtime); rows
+        # without mtime_ns can also hold the truncated value
+        for file_path in self.indexer.scan_directory(self.test_files_dir, False):
+            path_obj = Path(file_path)
+            stat_info = path_obj.stat()
+            self.indexer.conn.execute(
+                """
+                UPDATE files
+                SET modification_datetime = ?, mtime_ns = NULL, inode = NULL
+                WHERE path = ? AND filename = ?
+                """,
+                [
+                    datetime.fromtimestamp(stat_info.st_mtime)
+                    if rounded
+                    else _mtime_datetime(stat_info.st_mtime_ns),
+                    str(path_obj.parent),
+                    path_obj.name,
+                ],
+            )
+
+        self.indexer.reset_optimization_counters()
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        assert self.indexer.checksum_calculations == 0
+        assert self.indexer.checksum_reuses == 3
+
     def test_checksum_optimization_with_modified_file(self):
         """Test that optimization still calculates checksums for modified files."""
         # Reset counters and index initially (non-recursive)
@@ -421,64 +718,34 @@ class TestFileIndexer:
         # Clean up the symlink
         symlink_file.unlink()
 
-    def test_checksum_size_limits(self):
-        """Test that large files can be skipped for checksum calculation."""
-        # Create indexer with very small size limit
-        small_limit_indexer = FileIndexer(
-            str(self.db_path) + "_small",
-            max_checksum_size=10,  # 10 bytes limit
-            skip_empty_files=False,
-        )
-
-        try:
-            # Reset counters
-            small_limit_indexer.reset_optimization_counters()
-
-            # Index files - most should be skipped due to size
-            small_limit_indexer.update_database(self.test_files_dir, recursive=False)
-
-            stats = small_limit_indexer.get_stats()
-
-            # Should have files indexed but some without checksums due to size
-            assert stats["total_files"] == 4  # All files indexed
-            assert stats["files_without_checksum"] > 0  # Some files skipped checksum
-            assert (
-                small_limit_indexer.skipped_checksums > 0
-            )  # Tracked skipped checksums
-
-        finally:
-            small_limit_indexer.close()
-
-    def test_empty_file_handling(self):
-        """Test handling of empty files with different configurations."""
-        # Test with skip_empty_files=True (default)
-        skip_indexer = FileIndexer(str(self.db_path) + "_skip", skip_empty_files=True)
-
-        try:
-            skip_indexer.update_database(self.test_files_dir, recursive=False)
-            skip_indexer.get_stats()
-
-            # Empty file should not have checksum
-            empty_results = skip_indexer.search_files(filename_pattern="empty.txt")
-            assert len(empty_results) == 1
-            assert empty_results[0]["checksum"] is None
-
-        finally:
-            skip_indexer.close()
-
-        # Test with skip_empty_files=False
-        calc_indexer = FileIndexer(str(self.db_path) + "_calc", skip_empty_files=False)
+    @pytest.mark.parametrize(
+        "skip_empty_files, max_checksum_size, filename, has_checksum",
+        [
+            # Empty files are skipped by default
+            (True, 100 * 1024 * 1024, "empty.txt", False),
+            (False, 100 * 1024 * 1024, "empty.txt", True),
+            # Files above the size limit (11 bytes > 10) get no checksum
+            (False, 10, "test1.txt", False),
+        ],
+    )
+    def test_checksum_configuration(
+        self, skip_empty_files, max_checksum_size, filename, has_checksum
+    ):
+        """Test that empty-file and size-limit settings decide which files get checksums."""
+        self.indexer.skip_empty_files = skip_empty_files
+        self.indexer.max_checksum_size = max_checksum_size
+        self.indexer.reset_optimization_counters()
 
-        try:
-            calc_indexer.update_database(self.test_files_dir, recursive=False)
+        self.indexer.update_database(self.test_files_dir, recursive=False)
 
-            # Empty file should have checksum
-            empty_results = calc_indexer.search_files(filename_pattern="empty.txt")
-            assert len(empty_results) == 1
-            assert empty_results[0]["checksum"] is not None
+        stats = self.indexer.get_stats()
+        assert stats["total_files"] == 4  # All files indexed either way
+        # Every file left without a checksum was deliberately skipped
+        assert self.indexer.skipped_checksums == stats["files_without_checksum"]
 
-        finally:
-            calc_indexer.close()
+        results = self.indexer.search_files(filename_pattern=filename)
+        assert len(results) == 1
+        assert (results[0]["checksum"] is not None) == has_checksum
 
     def test_batch_processing(self):
         """Test that batch processing works correctly."""
@@ -564,6 +831,35 @@ class TestFileIndexer:
                     len(duplicates) >= 0
                 )  # May or may not have duplicates depending on sizes
 
+    @pytest.mark.parametrize("skip_empty_files", [True, False])
+    def test_get_sizes_needing_checksums(self, skip_empty_files):
+        """Test which size groups Phase 2 has to hash."""
+        self.indexer.skip_empty_files = skip_empty_files
+        self.indexer.conn.executemany(
+            """
+            INSERT INTO files (path, filename, checksum, modification_datetime, file_size)
+            VALUES ('/data', ?, ?, '2024-01-01 00:00:00', ?)
+            """,
+            [
+                ("a", "abc", 10),  # size 10: one checksum missing
+                ("b", None, 10),
+                ("c", "def", 20),  # size 20: all checksums present
+                ("d", "ghi", 20),
+                ("e", None, 30),  # size 30: a single file
+                ("f", None, 0),  # empty files
+                ("g", None, 0),
+            ],
+        )
+
+        expected = [(10, 2)] if skip_empty_files else [(0, 2), (10, 2)]
+        assert self.indexer._get_sizes_needing_checksums() == expected
+
+        batches = list(self.indexer._iter_files_needing_checksums(batch_size=1))
+        expected_paths = (
+            ["/data/b"] if skip_empty_files else ["/data/f", "/data/g", "/data/b"]
+        )
+        assert batches == [[path] for path in expected_paths]
+
     def test_two_phase_indexing_complete(self):
         """Test complete two-phase indexing process."""
         # Create a new indexer for clean test
@@ -633,6 +929,47 @@ class TestFileIndexer:
         assert results1[0]["checksum"] is not None
         assert results2[0]["checksum"] is not None
 
+    def test_calculate_checksums_for_files_stats_once(self, monkeypatch):
+        """
+        Test that Phase 2 looks up each file's metadata with a single stat.
+        The only other stat is the checksum worker's check before opening.
+        """
+        self.indexer.index_files_without_checksums(self.test_files_dir, recursive=False)
+        file_paths = [str(self.test_file1), str(self.test_file2)]
+
+        stat_calls = []
+        for name in ("stat", "lstat"):
+            real_stat = getattr(os, name)
+
+            def counting_stat(path, *args, _real=real_stat, **kwargs):
+                stat_calls.append(str(path))
+                return _real(path, *args, **kwargs)
+
+            monkeypatch.setattr(os, name, counting_stat)
+        assert self.indexer._calculate_checksums_for_files(file_paths) == 2
+        assert sorted(stat_calls) == sorted(file_paths * 2)
+
+    @pytest.mark.usefixtures("use_arrow")
+    def test_calculate_checksums_for_files_refreshes_changed(self):
+        """Test that files modified since indexing get new checksum and metadata."""
+        self.indexer.index_files_without_checksums(self.test_files_dir, recursive=False)
+
+        self.test_file1.write_text("Content changed after indexing")
+        updated_count = self.indexer._calculate_checksums_for_files(
+            [str(self.test_file1), str(self.test_file2)]
+        )
+
+        assert updated_count == 2
+        unchanged = self.indexer.search_files(filename_pattern="test2.txt")[0]
+        assert unchanged["checksum"] == self.indexer._calculate_checksum(
+            str(self.test_file2)
+        )
+        result = self.indexer.search_files(filename_pattern="test1.txt")[0]
+        assert result["checksum"] == self.indexer._calculate_checksum(
+            str(self.test_file1)
+        )
+        assert result["file_size"] == self.test_file1.stat().st_size
+
     def test_two_phase_with_no_duplicates(self):
         """Test two-phase indexing when no files have duplicate sizes."""
         # Create files with unique sizes
@@ -947,6 +1284,53 @@ class TestFileIndexer:
 
             shutil.rmtree(symlink_dir, ignore_errors=True)
 
+    def test_checksum_worker_without_noatime_permission(self, monkeypatch):
+        """Test hashing falls back to a plain open when O_NOATIME is refused."""
+        from file_indexer.indexer import _calculate_checksum_worker
+
+        if not hasattr(os, "O_NOATIME"):
+            pytest.skip("O_NOATIME not supported on this platform")
+
+        real_open = os.open
+        opened_flags = []
+
+        def open_as_non_owner(path, flags, *args, **kwargs):
+            opened_flags.append(flags)
+            if flags & os.O_NOATIME:
+                raise PermissionError("Operation not permitted")
+            return real_open(path, flags, *args, **kwargs)
+
+        monkeypatch.setattr(os, "open", open_as_non_owner)
+        _, checksum = _calculate_checksum_worker(str(self.test_file1), "sha256")
+
+        assert checksum == hashlib.sha256(b"Hello World").hexdigest()
+        assert len(opened_flags) == 2
+        assert not opened_flags[1] & os.O_NOATIME
+
+    def test_checksum_worker_skips_symlinks_and_fifos(self, monkeypatch):
+        """Test that the worker rejects symlinks and FIFOs without opening them."""
+        from file_indexer.indexer import _calculate_checksum_worker
+
+        symlink_path = Path(self.test_files_dir) / "link.txt"
+        pipe_path = Path(self.test_files_dir) / "pipe"
+        try:
+            symlink_path.symlink_to(self.test_file1)
+            os.mkfifo(pipe_path)
+        except (OSError, AttributeError, NotImplementedError):
+            pytest.skip("Symbolic links or named pipes not supported")
+
+        real_open = os.open
+        opened = []
+
+        def recording_open(path, *args, **kwargs):
+            opened.append(str(path))
+            return real_open(path, *args, **kwargs)
+
+        monkeypatch.setattr(os, "open", recording_open)
+        assert _calculate_checksum_worker(str(symlink_path)) == (str(symlink_path), "")
+        assert _calculate_checksum_worker(str(pipe_path)) == (str(pipe_path), "")
+        assert opened == []
+
     def test_checksum_worker_function(self):
         """Test the checksum worker function directly."""
         import tempfile
@@ -1042,6 +1426,322 @@ class TestFileIndexer:
             # If an exception is raised, it should be a controlled one
             assert True
 
+    @pytest.mark.usefixtures("use_arrow")
+    def test_bulk_database_operations(self):
+        """Test bulk inserts and updates with and without the Arrow path."""
+        mod_time = datetime(2024, 1, 2, 3, 4, 5, 123456)
+        # Sub-microsecond digits are truncated in the TIMESTAMP column
+        mtime_ns = int(mod_time.timestamp()) * 1_000_000_000 + 123_456_789
+        inserts = [
+            ("/data", "a.txt", "abc", 10, mtime_ns, 1, 5),
+            ("/data", "b.txt", None, 20, mtime_ns, 2, 5),
+        ]
+        assert self.indexer._bulk_database_operations(inserts, []) == (2, 0)
+
+        updates = [("def", 11, mtime_ns + 1, 1, 5, "/data", "a.txt")]
+        assert self.indexer._bulk_database_operations([], updates) == (0, 1)
+
+        rows = self.indexer.conn.execute(
+            "SELECT filename, checksum, file_size, modification_datetime, mtime_ns FROM files ORDER BY filename"
+        ).fetchall()
+        assert rows == [
+            ("a.txt", "def", 11, mod_time, mtime_ns + 1),
+            ("b.txt", None, 20, mod_time, mtime_ns),
+        ]
+
+    def test_modification_datetime_matches_local_time(self):
+        """Test that the stored TIMESTAMP is the file's local modification time."""
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+
+        stat_info = self.test_file1.stat()
+        stored = self.indexer.conn.execute(
+            "SELECT modification_datetime FROM files WHERE filename = ?",
+            [self.test_file1.name],
+        ).fetchone()[0]
+        expected = datetime.fromtimestamp(stat_info.st_mtime_ns // 1_000_000_000)
+        assert stored == expected.replace(
+            microsecond=stat_info.st_mtime_ns // 1000 % 1_000_000
+        )
+
+    @pytest.mark.parametrize(
+        "mtime_ns",
+        [
+            0,
+            1_700_000_000_123_456_789,
+            # fromtimestamp(st_mtime) would round these up to the next second
+            1_700_000_000_999_999_999,
+            1_700_000_000_999_999_500,
+            -1_500,
+            -1_000_000_000_999_999_999,
+        ],
+    )
+    def test_mtime_datetime_matches_sql(self, mtime_ns):
+        """Test that _mtime_datetime computes what MTIME_NS_TO_TIMESTAMP stores."""
+        from file_indexer.indexer import MTIME_NS_TO_TIMESTAMP, _mtime_datetime
+
+        stored = self.indexer.conn.execute(
+            f"SELECT {MTIME_NS_TO_TIMESTAMP.format('$1')}", [mtime_ns]
+        ).fetchone()[0]
+        assert _mtime_datetime(mtime_ns) == stored
+
+    @pytest.mark.usefixtures("use_arrow")
+    def test_get_existing_files_bulk(self):
+        """Test bulk lookup of existing records with and without Arrow."""
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+
+        existing = self.indexer._get_existing_files_bulk(
+            [str(self.test_file1), str(Path(self.test_files_dir) / "missing.txt")]
+        )
+        assert list(existing) == [(self.test_files_dir, self.test_file1.name)]
+        record = existing[(self.test_files_dir, self.test_file1.name)]
+        file_stat = self.test_file1.stat()
+        assert record.checksum == self.indexer._calculate_checksum(str(self.test_file1))
+        assert record.file_size == file_stat.st_size
+        assert record.mtime_ns == file_stat.st_mtime_ns
+        assert record.inode == file_stat.st_ino
+
+    @pytest.mark.parametrize("executor", ["process", "thread"])
+    def test_checksum_pool_reused_across_batches(self, executor):
+        """Test that the checksum worker pool is started once and closed."""
+        indexer = FileIndexer(
+            str(self.db_path) + "_pool", max_workers=2, checksum_executor=executor
+        )
+        try:
+            files = [str(self.test_file1), str(self.test_file2)]
+            first = indexer._calculate_checksums_parallel(files)
+            pool = indexer._checksum_pool
+            second = indexer._calculate_checksums_parallel(files)
+
+            assert pool is not None
+            assert indexer._checksum_pool is pool
+            assert first == second
+            assert first[str(self.test_file1)] == indexer._calculate_checksum(
+                str(self.test_file1)
+            )
+        finally:
+            indexer.close()
+        assert indexer._checksum_pool is None
+
+    def test_default_checksum_executor_uses_threads(self):
+        """Test that checksums run on a thread pool unless processes are requested."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        indexer = FileIndexer(str(self.db_path) + "_default_pool", max_workers=2)
+        try:
+            indexer._calculate_checksums_parallel([str(self.test_file1)])
+            assert isinstance(indexer._checksum_pool, ThreadPoolExecutor)
+        finally:
+            indexer.close()
+
+    def test_invalid_checksum_executor(self):
+        """Test that unknown checksum executors are rejected."""
+        with pytest.raises(ValueError, match="Unknown checksum executor"):
+            FileIndexer(str(self.db_path) + "_bad", checksum_executor="fiber")
+
+    @pytest.mark.usefixtures("use_arrow")
+    def test_checksum_cache_reused_for_reindexed_files(self):
+        """Test that unchanged files indexed again reuse cached checksums."""
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        expected = self.indexer._calculate_checksum(str(self.test_file1))
+        self.indexer.close()
+
+        # Survives reopening the database and removing the old rows
+        self.indexer = FileIndexer(str(self.db_path))
+        self.indexer.conn.execute("DELETE FROM files")
+
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        assert self.indexer.checksum_calculations == 0
+        results = self.indexer.search_files(filename_pattern="test1.txt")
+        assert results[0]["checksum"] == expected
+
+    def test_checksum_cache_ignores_changed_ctime(self):
+        """Test that a cache entry is not used once the inode has changed."""
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        self.indexer.conn.execute("DELETE FROM files")
+
+        # Same mtime and size, but the inode change time moves on
+        self.test_file1.chmod(0o600)
+        self.indexer.reset_optimization_counters()
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        assert self.indexer.checksum_calculations == 1
+
+    def test_checksum_cache_skips_files_without_inode(self):
+        """Test that files reporting no inode number bypass the cache."""
+        path = str(self.test_file1)
+        # As os.DirEntry.stat() reports on Windows: st_dev and st_ino are 0
+        stat_info = os.stat_result((stat.S_IFREG | 0o644, 0, 0, 1, 0, 0, 11, 0, 0, 0))
+        self.indexer.conn.execute(
+            "INSERT INTO checksum_cache VALUES (0, 0, 0, 11, 'other', 0)"
+        )
+
+        assert self.indexer._get_cached_checksums({path: stat_info}) == {}
+        self.indexer._store_cached_checksums({path: "abc"}, {path: stat_info})
+        rows = self.indexer.conn.execute(
+            "SELECT checksum FROM checksum_cache"
+        ).fetchall()
+        assert rows == [("other",)]
+
+    def test_cleanup_prunes_checksum_cache(self):
+        """Test that cleanup drops cached checksums of deleted files."""
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        deleted_inode = self.test_file1.stat().st_ino
+        self.test_file1.unlink()
+
+        self.indexer.cleanup_deleted_files()
+        inodes = {
+            row[0]
+            for row in self.indexer.conn.execute(
+                "SELECT inode FROM checksum_cache"
+            ).fetchall()
+        }
+        assert deleted_inode not in inodes
+        assert self.test_file2.stat().st_ino in inodes
+
+    def test_cleanup_prunes_checksum_cache_by_device(self):
+        """Test that a cached inode on another device is pruned on cleanup."""
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        file_stat = self.test_file1.stat()
+        self.indexer.conn.execute(
+            "INSERT INTO checksum_cache VALUES (?, ?, 0, 11, 'other', 0)",
+            [file_stat.st_dev + 1, file_stat.st_ino],
+        )
+
+        self.indexer.cleanup_deleted_files()
+        devices = {
+            row[0]
+            for row in self.indexer.conn.execute(
+                "SELECT device FROM checksum_cache WHERE inode = ?",
+                [file_stat.st_ino],
+            ).fetchall()
+        }
+        assert devices == {file_stat.st_dev}
+
+    def test_checksum_cache_ignores_modified_files(self):
+        """Test that a cache entry is not used once the file has changed."""
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        self.indexer.conn.execute("DELETE FROM files")
+
+        self.test_file1.write_text("Different content, different size")
+        self.indexer.reset_optimization_counters()
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        assert self.indexer.checksum_calculations == 1
+
+        results = self.indexer.search_files(filename_pattern="test1.txt")
+        assert results[0]["checksum"] == self.indexer._calculate_checksum(
+            str(self.test_file1)
+        )
+
+    def test_checksum_cache_cleared_on_algorithm_change(self):
+        """Test that cached checksums are dropped with the algorithm they used."""
+        pytest.importorskip("blake3")
+        self.indexer.close()
+        self.indexer = FileIndexer(str(self.db_path), hash_algorithm="sha256")
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+        self.indexer.conn.execute("DELETE FROM files")
+        self.indexer.close()
+
+        self.indexer = FileIndexer(str(self.db_path), hash_algorithm="blake3")
+        count = self.indexer.conn.execute(
+            "SELECT COUNT(*) FROM checksum_cache"
+        ).fetchone()[0]
+        assert count == 0
+
+    def test_empty_files_not_opened(self, monkeypatch):
+        """Test that empty files get the empty-input digest without being read."""
+        self.indexer.close()
+        self.indexer = FileIndexer(
+            str(self.db_path), skip_empty_files=False, use_parallel_processing=False
+        )
+
+        hashed = []
+        original = self.indexer._calculate_checksums_parallel
+
+        def record_hashed(file_paths):
+            hashed.extend(file_paths)
+            return original(file_paths)
+
+        monkeypatch.setattr(
+            self.indexer, "_calculate_checksums_parallel", record_hashed
+        )
+        self.indexer.update_database(self.test_files_dir, recursive=False)
+
+        assert str(self.empty_file) not in hashed
+        assert self.indexer.checksum_calculations == 4
+        results = self.indexer.search_files(filename_pattern="empty.txt")
+        assert results[0]["checksum"] == self.indexer._calculate_checksum(
+            str(self.empty_file)
+        )
+
+    def test_process_batch_individually(self):
+        """Test the per-file fallback adds new files and updates changed ones."""
+        files = [str(self.test_file1), str(self.test_file2)]
+        assert self.indexer._process_batch_individually(files) == (2, 0, 0)
+
+        self.test_file2.write_text("Changed content that is longer")
+        assert self.indexer._process_batch_individually(files) == (0, 1, 0)
+
+        results = self.indexer.search_files(filename_pattern="test2.txt")
+        assert results[0]["checksum"] == self.indexer._calculate_checksum(
+            str(self.test_file2)
+        )
+
+    def test_indexes_rebuilt_after_initial_load_only(self, monkeypatch):
+        """Test that indexes are dropped for a first load and restored after."""
+        drops = []
+        original_drop = self.indexer._drop_indexes
+        monkeypatch.setattr(
+            self.indexer,
+            "_drop_indexes",
+            lambda: (drops.append(True), original_drop()),
+        )
+
+        def index_names():
+            rows = self.indexer.conn.execute(
+                "SELECT index_name FROM duckdb_indexes() WHERE table_name = 'files'"
+            ).fetchall()
+            return {name for (name,) in rows}
+
+        self.indexer.update_database(self.test_files_dir)
+        assert len(drops) == 1
+        assert index_names() == {
+            "idx_checksum",
+            "idx_modification_datetime",
+            "idx_path_filename",
+            "idx_file_size",
+        }
+
+        self.indexer.update_database(self.test_files_dir)
+        assert len(drops) == 1
+
+    def test_duckdb_config(self):
+        """Test that extra DuckDB settings are applied to the connection."""
+        indexer = FileIndexer(
+            str(self.db_path) + "_config",
+            duckdb_config={"threads": 2, "temp_directory": self.temp_dir},
+        )
+        try:
+            threads, temp_directory = indexer.conn.execute(
+                "SELECT current_setting('threads'), current_setting('temp_directory')"
+            ).fetchone()
+            assert threads == 2
+            assert temp_directory == self.temp_dir
+        finally:
+            indexer.close()
+
+    def test_duckdb_config_defaults(self):
+        """Test that default DuckDB settings apply and can be overridden."""
+        setting = "SELECT current_setting('preserve_insertion_order')"
+        assert self.indexer.conn.execute(setting).fetchone()[0] is False
+
+        indexer = FileIndexer(
+            str(self.db_path) + "_ordered",
+            duckdb_config={"preserve_insertion_order": True},
+        )
+        try:
+            assert indexer.conn.execute(setting).fetchone()[0] is True
+        finally:
+            indexer.close()
+
     def test_parallel_processing_disabled(self):
         """Test sequential processing when parallel processing is disabled."""
         # Create indexer with parallel processing disabled
@@ -1142,6 +1842,74 @@ class TestFileIndexer:
         # Verify deleted files counter is updated
         assert self.indexer.deleted_files == 2
 
+    @pytest.mark.usefixtures("use_arrow")
+    def test_delete_files_from_database(self):
+        """Test bulk deletion of file records with and without pyarrow."""
+        self.indexer.update_database(self.test_files_dir, recursive=True)
+
+        self.indexer._delete_files_from_database(
+            [
+                (str(self.test_files_dir), "test1.txt"),
+                (str(self.subdir), "test3.txt"),
+                (str(self.subdir), "missing.txt"),
+            ]
+        )
+
+        remaining = {
+            result["filename"]
+            for result in self.indexer.search_files(filename_pattern="%")
+        }
+        assert remaining == {"test2.txt", "duplicate.txt", "empty.txt"}
+
+    def test_cleanup_with_concurrent_directory_listing(self):
+        """Test cleanup lists directories on a thread pool when scan_workers > 1."""
+        indexer = FileIndexer(str(self.db_path) + "_cleanup_workers", scan_workers=4)
+        try:
+            indexer.update_database(self.test_files_dir, recursive=True)
+            self.test_file1.unlink()
+            self.test_file4.unlink()
+
+            cleanup_result = indexer.cleanup_deleted_files()
+
+            assert cleanup_result["total_checked"] == 5
+            assert cleanup_result["deleted_files"] == 2
+            assert indexer.get_stats()["total_files"] == 3
+        finally:
+            indexer.close()
+
+    def test_cleanup_treats_broken_symlink_as_deleted(self):
+        """Test that an indexed file replaced by a broken symlink is removed."""
+        self.indexer.update_database(self.test_files_dir, recursive=True)
+        self.test_file1.unlink()
+        self.test_file2.unlink()
+        try:
+            self.test_file1.symlink_to(Path(self.test_files_dir) / "missing.txt")
+            self.test_file2.symlink_to(self.test_file3)
+        except (OSError, NotImplementedError):
+            pytest.skip("Symbolic links not supported")
+
+        cleanup_result = self.indexer.cleanup_deleted_files()
+
+        # As with exists(), only the symlink to an existing file counts as present
+        assert cleanup_result["deleted_files"] == 1
+        assert self.indexer.search_files(filename_pattern="test1.txt") == []
+        assert len(self.indexer.search_files(filename_pattern="test2.txt")) == 1
+
+    def test_cleanup_falls_back_when_directory_unlistable(self, monkeypatch):
+        """Test cleanup checks files one by one when a directory can't be listed."""
+        self.indexer.update_database(self.test_files_dir, recursive=True)
+        self.test_file1.unlink()
+
+        monkeypatch.setattr(
+            "file_indexer.indexer._list_directory",
+            lambda path: ([], PermissionError(f"Permission denied: {path}")),
+        )
+        cleanup_result = self.indexer.cleanup_deleted_files()
+
+        assert cleanup_result["total_checked"] == 5
+        assert cleanup_result["deleted_files"] == 1
+        assert self.indexer.get_stats()["total_files"] == 4
+
     def test_cleanup_empty_directories(self):
         """Test cleanup of empty directories."""
         # First, index some files including subdirectory
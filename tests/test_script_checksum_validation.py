@@ -4,9 +4,13 @@ Simple test script to verify the checksum calculation fix.
 """
 
 import sqlite3
+import sys
+from itertools import groupby
 
+import pytest
 
-def create_test_database():
+
+def create_test_database(include_empty_files=False):
     """Create a test database with files that simulate the issue."""
     conn = sqlite3.connect(":memory:")
 
@@ -41,6 +45,13 @@ def create_test_database():
         ("/path7", "file7.txt", 4000, "ghi789", "2024-01-01 10:00:00"),
         ("/path8", "file8.txt", 4000, "jkl012", "2024-01-01 10:00:00"),
     ]
+    if include_empty_files:
+        # Empty files - excluded by the empty file filter
+        test_data += [
+            ("/path9", "empty1.txt", 0, None, "2024-01-01 10:00:00"),
+            ("/path10", "empty2.txt", 0, None, "2024-01-01 10:00:00"),
+            ("/path11", "empty3.txt", 0, "xyz999", "2024-01-01 10:00:00"),
+        ]
 
     conn.executemany(
         """
@@ -54,113 +65,115 @@ def create_test_database():
     return conn
 
 
-def test_old_query():
-    """Test the old query logic."""
-    print("=== Testing OLD query logic ===")
-    conn = create_test_database()
-
-    # Old query - only finds sizes where ALL files have checksum IS NULL
-    old_query = """
-    SELECT file_size, COUNT(*) as file_count
-    FROM files
-    WHERE checksum IS NULL
-    GROUP BY file_size
-    HAVING COUNT(*) > 1
-    ORDER BY file_size
-    """
-
-    results = conn.execute(old_query).fetchall()
-    print(f"Old query found {len(results)} file sizes:")
-    for size, count in results:
-        print(f"  Size {size}: {count} files")
-
-    conn.close()
-
-
-def test_new_query():
-    """Test the new query logic."""
-    print("\n=== Testing NEW query logic ===")
-    conn = create_test_database()
-
-    # New query - finds sizes where there are multiple files AND at least one has checksum IS NULL
-    new_query = """
-    SELECT file_size, COUNT(*) as file_count
-    FROM files
-    GROUP BY file_size
-    HAVING COUNT(*) > 1 AND SUM(CASE WHEN checksum IS NULL THEN 1 ELSE 0 END) > 0
-    ORDER BY file_size
-    """
-
-    results = conn.execute(new_query).fetchall()
-    print(f"New query found {len(results)} file sizes:")
-    for size, count in results:
-        print(f"  Size {size}: {count} files")
+# Old query - only finds sizes where ALL files have checksum IS NULL
+OLD_QUERY = """
+SELECT file_size, COUNT(*) as file_count
+FROM files
+WHERE checksum IS NULL
+GROUP BY file_size
+HAVING COUNT(*) > 1
+ORDER BY file_size
+"""
 
-    # Show details for each size
-    for size, _count in results:
-        print(f"\nDetails for size {size}:")
-        files = conn.execute(
-            """
-        SELECT path, filename, checksum IS NULL as needs_checksum
-        FROM files WHERE file_size = ?
-        ORDER BY path, filename
-        """,
-            [size],
-        ).fetchall()
-
-        for path, filename, needs_checksum in files:
-            status = "NEEDS CHECKSUM" if needs_checksum else "has checksum"
-            print(f"    {path}/{filename}: {status}")
+# New query - finds sizes where there are multiple files AND at least one has checksum IS NULL
+NEW_QUERY = """
+SELECT file_size, COUNT(*) as file_count
+FROM files
+GROUP BY file_size
+HAVING COUNT(*) > 1 AND COUNT(*) > COUNT(checksum)
+ORDER BY file_size
+"""
 
-    conn.close()
+# New query with empty file filtering
+NEW_QUERY_WITH_EMPTY_FILTER = """
+SELECT file_size, COUNT(*) as file_count
+FROM files
+WHERE file_size > 0
+GROUP BY file_size
+HAVING COUNT(*) > 1 AND COUNT(*) > COUNT(checksum)
+ORDER BY file_size
+"""
 
+# Files of the sizes a query found, fetched for all sizes in one statement
+DETAILS_QUERY = """
+SELECT file_size, path, filename, checksum IS NULL as needs_checksum
+FROM files
+WHERE file_size IN (SELECT file_size FROM ({query}))
+ORDER BY file_size, path, filename
+"""
 
-def test_with_empty_files():
-    """Test the new query logic with empty file filtering."""
-    print("\n=== Testing NEW query logic with empty file filtering ===")
-    conn = create_test_database()
+QUERIES = {
+    "old": OLD_QUERY,
+    "new": NEW_QUERY,
+    "new_with_empty_filter": NEW_QUERY_WITH_EMPTY_FILTER,
+}
+
+# Queries run against a database that also holds empty files
+EMPTY_FILE_QUERIES = {"new_with_empty_filter"}
+
+# (file_size, file_count) rows each query should return
+EXPECTED_RESULTS = {
+    # Misses size 1000, where only some files lack checksums
+    "old": [(2000, 2)],
+    "new": [(1000, 3), (2000, 2)],
+    "new_with_empty_filter": [(1000, 3), (2000, 2)],
+}
+
+
+@pytest.fixture(scope="module")
+def databases():
+    """One database without and one with empty files, shared by all queries."""
+    connections = {
+        include_empty_files: create_test_database(include_empty_files)
+        for include_empty_files in (False, True)
+    }
+    yield connections
+    for connection in connections.values():
+        connection.close()
+
+
+@pytest.mark.parametrize("query_name", list(QUERIES))
+def test_query(databases, query_name):
+    """Test that each query finds the expected file sizes."""
+    conn = databases[query_name in EMPTY_FILE_QUERIES]
+    results = conn.execute(QUERIES[query_name]).fetchall()
+    assert results == EXPECTED_RESULTS[query_name]
+
+
+def format_results(conn, query_name):
+    """Return the lines describing the file sizes a query finds, with per-file details."""
+    lines = [f"\n=== Testing {query_name} query logic ==="]
+    results = conn.execute(QUERIES[query_name]).fetchall()
+    lines.append(f"Query found {len(results)} file sizes:")
+    lines.extend(f"  Size {size}: {count} files" for size, count in results)
 
-    # Add some empty files
-    conn.executemany(
-        """
-    INSERT INTO files (path, filename, file_size, checksum, modification_datetime)
-    VALUES (?, ?, ?, ?, ?)
-    """,
-        [
-            ("/path9", "empty1.txt", 0, None, "2024-01-01 10:00:00"),
-            ("/path10", "empty2.txt", 0, None, "2024-01-01 10:00:00"),
-            ("/path11", "empty3.txt", 0, "xyz999", "2024-01-01 10:00:00"),
-        ],
-    )
-    conn.commit()
-
-    # New query with empty file filtering
-    new_query_with_empty_filter = """
-    SELECT file_size, COUNT(*) as file_count
-    FROM files
-    WHERE file_size > 0
-    GROUP BY file_size
-    HAVING COUNT(*) > 1 AND SUM(CASE WHEN checksum IS NULL THEN 1 ELSE 0 END) > 0
-    ORDER BY file_size
-    """
+    # Show details for each size
+    details = conn.execute(DETAILS_QUERY.format(query=QUERIES[query_name]))
+    for size, files in groupby(details, key=lambda row: row[0]):
+        lines.append(f"\nDetails for size {size}:")
+        for _, path, filename, needs_checksum in files:
+            status = "NEEDS CHECKSUM" if needs_checksum else "has checksum"
+            lines.append(f"    {path}/{filename}: {status}")
+    return lines
 
-    results = conn.execute(new_query_with_empty_filter).fetchall()
-    print(f"New query with empty file filtering found {len(results)} file sizes:")
-    for size, count in results:
-        print(f"  Size {size}: {count} files")
 
-    conn.close()
+SUMMARY = [
+    "\n=== SUMMARY ===",
+    "The old query only found file sizes where ALL files lacked checksums.",
+    "The new query correctly finds file sizes where:",
+    "1. There are multiple files with the same size",
+    "2. At least one of those files lacks a checksum",
+    "This ensures that newly added files get checksums calculated even if",
+    "other files of the same size already have checksums.",
+]
 
 
 if __name__ == "__main__":
-    test_old_query()
-    test_new_query()
-    test_with_empty_files()
-
-    print("\n=== SUMMARY ===")
-    print("The old query only found file sizes where ALL files lacked checksums.")
-    print("The new query correctly finds file sizes where:")
-    print("1. There are multiple files with the same size")
-    print("2. At least one of those files lacks a checksum")
-    print("This ensures that newly added files get checksums calculated even if")
-    print("other files of the same size already have checksums.")
+    output = []
+    for name in QUERIES:
+        demo_conn = create_test_database(name in EMPTY_FILE_QUERIES)
+        output.extend(format_results(demo_conn, name))
+        demo_conn.close()
+
+    # Written in one call instead of one print per row
+    sys.stdout.write("\n".join([*output, *SUMMARY]) + "\n")